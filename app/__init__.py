@@ -2,8 +2,16 @@ from flask import Flask
 from dotenv import load_dotenv
 import os
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 
 db = SQLAlchemy()
+migrate = Migrate()
+
+
+# SQLite URL that opens the snapshot file read-only
+def snapshot_url(path):
+    return f"sqlite:///file:{os.path.abspath(path)}?mode=ro&uri=true"
+
 
 def create_app():
     # environment variables
@@ -13,8 +21,13 @@ def create_app():
     # flask app init
     app = Flask(__name__)
 
-    from config import DATABASE_URL
-    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
+    from config import DATABASE_URL, SNAPSHOT_PATH
+    if SNAPSHOT_PATH:
+        # read-only local snapshot instead of the remote database
+        app.config['SQLALCHEMY_DATABASE_URI'] = snapshot_url(SNAPSHOT_PATH)
+        print("Serving from snapshot:", SNAPSHOT_PATH)
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     # set the secret key for the session
@@ -22,8 +35,22 @@ def create_app():
 
     # database initialisation
     db.init_app(app)
+    # schema migrations in migrations/, applied with `flask db upgrade`
+    migrate.init_app(app, db)
 
     from app.routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
 
+    # `flask export-snapshot` writes the SQLite snapshot
+    from app.snapshot import export_snapshot_command, SnapshotWatcher
+    app.cli.add_command(export_snapshot_command)
+
+    # a snapshot replaced while the server runs is picked up without a restart
+    if SNAPSHOT_PATH:
+        watcher = app.extensions['snapshot_watcher'] = SnapshotWatcher(SNAPSHOT_PATH)
+
+        @app.before_request
+        def reopen_replaced_snapshot():
+            watcher.check(db.engine)
+
     return app
\ No newline at end of file
@@ -0,0 +1,48 @@
+# import raw SQL support
+from sqlalchemy import text
+
+"""
+Folding of duplicate rows into the lowest id: every reference to a duplicate is pointed at the kept row, then the
+duplicates are deleted. Used by the unique keys migration, which has to fold boxers and fights that were stored
+twice before the unique indexes can be created, and by the resolver to merge mirror rows of the same bout.
+"""
+
+# duplicate row id -> id of the row that is kept, for each duplicated boxer name
+DUPLICATE_BOXERS = """
+    SELECT b.id AS dup_id, k.keep_id FROM boxers b
+    JOIN (SELECT name, MIN(id) AS keep_id FROM boxers GROUP BY name HAVING COUNT(*) > 1) k
+      ON b.name = k.name AND b.id <> k.keep_id
+"""
+
+# duplicate row id -> id of the row that is kept, for each duplicated fight key. GROUP BY puts NULL dates and
+# opponents together, and the join matches them the same way, so fights without a date are folded too
+DUPLICATE_FIGHTS = """
+    SELECT f.id AS dup_id, k.keep_id FROM fights f
+    JOIN (SELECT date, boxer_a_id, opponent_name, MIN(id) AS keep_id FROM fights
+          GROUP BY date, boxer_a_id, opponent_name HAVING COUNT(*) > 1) k
+      ON f.date IS NOT DISTINCT FROM k.date AND f.boxer_a_id = k.boxer_a_id
+     AND f.opponent_name IS NOT DISTINCT FROM k.opponent_name AND f.id <> k.keep_id
+"""
+
+# columns that reference boxers.id
+BOXER_REFERENCES = [('fights', 'boxer_a_id'), ('fights', 'boxer_b_id'), ('fights', 'winner_id'), ('statlines', 'boxer_id')]
+
+
+# point every reference to a duplicate row at the kept row, then delete the duplicates. works on a session or a
+# connection, returning how many rows were deleted
+def fold_duplicates(connection, duplicates, table, references):
+    for ref_table, column in references:
+        connection.execute(text(
+            f"UPDATE {ref_table} SET {column} = d.keep_id FROM ({duplicates}) d WHERE {ref_table}.{column} = d.dup_id"))
+    return connection.execute(text(f"DELETE FROM {table} WHERE id IN (SELECT dup_id FROM ({duplicates}) d)")).rowcount
+
+
+# fold boxers stored twice under one name, then fights stored twice under one natural key, returning both counts
+def fold_duplicate_keys(connection):
+    # the kept boxer keeps its own ranking_metrics row
+    connection.execute(text(f"DELETE FROM ranking_metrics WHERE boxer_id IN (SELECT dup_id FROM ({DUPLICATE_BOXERS}) d)"))
+    boxers = fold_duplicates(connection, DUPLICATE_BOXERS, 'boxers', BOXER_REFERENCES)
+
+    # folding boxers can turn fights into duplicates, so fights are folded second
+    fights = fold_duplicates(connection, DUPLICATE_FIGHTS, 'fights', [('statlines', 'fight_id')])
+    return boxers, fights
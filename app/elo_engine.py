@@ -0,0 +1,137 @@
+# import general packages
+import time
+import logging
+from array import array
+
+# import query constructs
+from sqlalchemy import select, update
+
+# import the models the engine reads and writes
+from app.models import Fight, RankingMetrics, RatingWatermark, DataVersion, upsert
+
+# import the shared elo constants and the baseline rating
+from app.logic import ELO_C, ELO_D
+from app.ratings import BASE_RATING
+
+# rating points exchanged per bout, scaled by how unexpected the result was
+ELO_K = 32
+# name of this engine in the rating_watermarks table
+ENGINE = 'elo'
+
+"""
+Chronological Elo replay over the fights table. Canonical bouts with both boxers and a date are rated in
+(date, id) order with the ELO_C / ELO_D expectation used by elo_winner: a win scores 1, a draw 0.5, and bouts
+without a known result (no contests, unresolved winners) are skipped. Ratings live in one array('d') with an
+id -> position map while replaying, and are written to ranking_metrics.elo_rating in one executemany.
+The last replayed fight is kept as a watermark, so a later run only rates bouts added since, starting from the
+stored ratings. New bouts dated before the watermark change history, so they trigger a full replay instead, and
+so does a watermark cleared by RatingWatermark.reset after the resolver or a refresh changed fights already stored.
+"""
+class EloState:
+    def __init__(self, ratings=()):
+        self.positions = {}
+        self.ratings = array('d')
+        for boxer_id, rating in ratings:
+            self.positions[boxer_id] = len(self.ratings)
+            self.ratings.append(rating)
+
+    def position(self, boxer_id):
+        position = self.positions.get(boxer_id)
+        if position is None:
+            position = self.positions[boxer_id] = len(self.ratings)
+            self.ratings.append(BASE_RATING)
+        return position
+
+    # rate one bout. score_a is 1 for a boxer_a win, 0.5 for a draw and 0 for a loss
+    def rate(self, boxer_a_id, boxer_b_id, score_a):
+        i = self.position(boxer_a_id)
+        j = self.position(boxer_b_id)
+        expected_a = 1 / (1 + ELO_C ** ((self.ratings[j] - self.ratings[i]) / ELO_D))
+        delta = ELO_K * (score_a - expected_a)
+        self.ratings[i] += delta
+        self.ratings[j] -= delta
+
+    def items(self, boxer_ids=None):
+        boxer_ids = self.positions if boxer_ids is None else boxer_ids
+        return ((boxer_id, self.ratings[self.positions[boxer_id]]) for boxer_id in boxer_ids)
+
+
+# score for boxer_a, or None when the bout has no usable result
+def bout_score(boxer_a_id, boxer_b_id, winner_id, method):
+    if method == 'Draw':
+        return 0.5
+    if method == 'NC' or winner_id is None:
+        return None
+    if winner_id == boxer_a_id:
+        return 1.0
+    if winner_id == boxer_b_id:
+        return 0.0
+    return None
+
+
+# canonical bouts that can be rated, in replay order, optionally only those added after a fight id
+def ratable_bouts(session, after_id=None):
+    query = (select(Fight.id, Fight.date, Fight.boxer_a_id, Fight.boxer_b_id, Fight.winner_id, Fight.method)
+             .where(Fight.boxer_a_id.isnot(None), Fight.boxer_b_id.isnot(None), Fight.date.isnot(None),
+                    Fight.canonical_filter())
+             .order_by(Fight.date, Fight.id))
+    if after_id is not None:
+        query = query.where(Fight.id > after_id)
+    return session.execute(query).all()
+
+
+# write (boxer_id, value, ...) rows to the given ranking_metrics columns in one executemany,
+# creating the row for boxers that have none
+def write_ratings(session, columns, rows):
+    if not rows:
+        return
+    statement = upsert(session, RankingMetrics)
+    statement = statement.on_conflict_do_update(index_elements=['boxer_id'],
+                                                set_={column: getattr(statement.excluded, column) for column in columns})
+    session.execute(statement, [dict(zip(('boxer_id',) + columns, row)) for row in rows])
+
+
+def replay_elo(session, full=False):
+    start = time.perf_counter()
+    watermark = session.get(RatingWatermark, ENGINE)
+
+    bouts = None
+    if not full and watermark and watermark.last_fight_id is not None:
+        bouts = ratable_bouts(session, after_id=watermark.last_fight_id)
+        if bouts and watermark.last_date and bouts[0].date < watermark.last_date:
+            logging.info("elo: new bouts predate the watermark, replaying the full history")
+            bouts = None
+
+    if bouts is None:
+        full = True
+        bouts = ratable_bouts(session)
+        state = EloState()
+        session.execute(update(RankingMetrics).values(elo_rating=None))
+    else:
+        state = EloState(session.execute(
+            select(RankingMetrics.boxer_id, RankingMetrics.elo_rating).where(RankingMetrics.elo_rating.isnot(None))))
+
+    touched = set()
+    rated = 0
+    for _, _, boxer_a_id, boxer_b_id, winner_id, method in bouts:
+        score = bout_score(boxer_a_id, boxer_b_id, winner_id, method)
+        if score is None:
+            continue
+        state.rate(boxer_a_id, boxer_b_id, score)
+        touched.add(boxer_a_id)
+        touched.add(boxer_b_id)
+        rated += 1
+
+    write_ratings(session, ('elo_rating',), list(state.items(touched)))
+
+    if bouts:
+        watermark = watermark or RatingWatermark(engine=ENGINE)
+        watermark.last_fight_id = max(max(bout.id for bout in bouts), watermark.last_fight_id or 0)
+        watermark.last_date = max(bouts[-1].date, watermark.last_date or bouts[-1].date)
+        session.add(watermark)
+        DataVersion.bump(session)
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"elo: {'full' if full else 'incremental'} replay rated {rated} of {len(bouts)} bouts, "
+                 f"{len(touched)} boxers updated in {elapsed:.3f}s")
+    return {'full': full, 'bouts': len(bouts), 'rated': rated, 'boxers': len(touched), 'seconds': elapsed}
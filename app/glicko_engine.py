@@ -0,0 +1,159 @@
+# import general packages
+import time
+import logging
+
+# import numpy for the per-period vectorised updates
+import numpy as np
+
+# import query constructs
+from sqlalchemy import update
+
+# import the models the engine writes
+from app.models import RankingMetrics, DataVersion
+
+# import the bout selection, scoring and bulk write shared with the Elo replay
+from app.elo_engine import ratable_bouts, bout_score, write_ratings
+
+# import the baseline rating and the Glicko-2 scale shared with glicko_winner
+from app.ratings import BASE_RATING
+from app.logic import GLICKO_SCALE, g
+
+# rating deviation and volatility of a boxer before their first rated bout
+GLICKO_INITIAL_RD = 350
+GLICKO_INITIAL_VOLATILITY = 0.06
+# system constant limiting how quickly volatility changes
+GLICKO_TAU = 0.5
+# convergence tolerance of the volatility iteration
+GLICKO_EPSILON = 0.000001
+# columns written to ranking_metrics
+GLICKO_COLUMNS = ('glicko_rating', 'glicko_rd', 'glicko_volatility')
+
+
+"""
+New volatilities for every boxer active in a period at once, by the Illinois iteration of the Glicko-2 paper.
+Each array holds one entry per active boxer. Entries converge at different speeds, so every step only updates
+the entries still further apart than GLICKO_EPSILON.
+"""
+def new_volatility(sigma, phi, v, delta):
+    a = np.log(sigma ** 2)
+    tau2 = GLICKO_TAU ** 2
+
+    def f(x, i):
+        ex = np.exp(x)
+        return (ex * (delta[i] ** 2 - phi[i] ** 2 - v[i] - ex) / (2 * (phi[i] ** 2 + v[i] + ex) ** 2)
+                - (x - a[i]) / tau2)
+
+    everyone = np.arange(len(a))
+    A = a.copy()
+    big_step = delta ** 2 > phi ** 2 + v
+    B = np.where(big_step, np.log(np.maximum(delta ** 2 - phi ** 2 - v, GLICKO_EPSILON)), a - GLICKO_TAU)
+    # walk the lower bracket down until f changes sign
+    pending = np.flatnonzero(~big_step)
+    while len(pending):
+        pending = pending[f(B[pending], pending) < 0]
+        B[pending] -= GLICKO_TAU
+
+    fA = f(A, everyone)
+    fB = f(B, everyone)
+    pending = np.flatnonzero(np.abs(B - A) > GLICKO_EPSILON)
+    while len(pending):
+        C = A[pending] + (A[pending] - B[pending]) * fA[pending] / (fB[pending] - fA[pending])
+        fC = f(C, pending)
+        crossed = fC * fB[pending] <= 0
+        A[pending] = np.where(crossed, B[pending], A[pending])
+        fA[pending] = np.where(crossed, fB[pending], fA[pending] / 2)
+        B[pending] = C
+        fB[pending] = fC
+        pending = pending[np.abs(B[pending] - A[pending]) > GLICKO_EPSILON]
+    return np.exp(A / 2)
+
+
+# deviation growth of boxers rated before who sit out the given number of rating periods. volatility does not
+# change while idle, so k periods add k * sigma^2 at once, capped at the initial deviation
+def inflate_idle(phi, sigma, idle, periods=1):
+    phi[idle] = np.minimum(np.sqrt(phi[idle] ** 2 + periods * sigma[idle] ** 2), GLICKO_INITIAL_RD / GLICKO_SCALE)
+
+
+"""
+One Glicko-2 rating period. a and b are the positions of the two boxers of each bout and score the result for a.
+All bouts in the period are rated against the ratings held at its start, as Glicko-2 prescribes, so each period
+is a handful of array operations: both sides of every bout are summed per boxer with np.bincount, then every
+active boxer is updated together. Boxers who have been rated before but did not box in the period only gain deviation.
+"""
+def rate_period(mu, phi, sigma, seen, a, b, score):
+    players = np.concatenate((a, b))
+    opponents = np.concatenate((b, a))
+    scores = np.concatenate((score, 1 - score))
+
+    g_opp = g(phi[opponents])
+    expected = 1 / (1 + np.exp(-g_opp * (mu[players] - mu[opponents])))
+    size = len(mu)
+    information = np.bincount(players, weights=g_opp ** 2 * expected * (1 - expected), minlength=size)
+    improvement = np.bincount(players, weights=g_opp * (scores - expected), minlength=size)
+
+    active = np.flatnonzero(information > 0)
+    v = 1 / information[active]
+    delta = v * improvement[active]
+
+    idle = seen.copy()
+    idle[active] = False
+    inflate_idle(phi, sigma, idle)
+
+    sigma[active] = new_volatility(sigma[active], phi[active], v, delta)
+    phi_star = np.sqrt(phi[active] ** 2 + sigma[active] ** 2)
+    phi[active] = 1 / np.sqrt(1 / phi_star ** 2 + 1 / v)
+    mu[active] = mu[active] + phi[active] ** 2 * improvement[active]
+    seen[active] = True
+
+
+"""
+Glicko-2 replay of the whole fights table, one rating period per calendar year from the first bout to the last.
+Years without any bouts are still rating periods, so a boxer's deviation grows once for every year of a layoff.
+The ratable bouts are the same as
+for the Elo replay (canonical, both boxers known, a win, loss or draw), loaded once into NumPy arrays, so the
+history is recomputed from scratch on every run and the result never depends on the order pages were scraped in.
+Ratings, deviations and volatilities are written to ranking_metrics in one executemany.
+"""
+def replay_glicko(session):
+    start = time.perf_counter()
+    bouts = [(date.year, boxer_a_id, boxer_b_id, bout_score(boxer_a_id, boxer_b_id, winner_id, method))
+             for _, date, boxer_a_id, boxer_b_id, winner_id, method in ratable_bouts(session)]
+    bouts = [bout for bout in bouts if bout[3] is not None]
+
+    session.execute(update(RankingMetrics).values(glicko_rating=None, glicko_rd=None, glicko_volatility=None))
+    if not bouts:
+        DataVersion.bump(session)
+        return {'bouts': 0, 'periods': 0, 'boxers': 0, 'seconds': time.perf_counter() - start}
+
+    years = np.fromiter((bout[0] for bout in bouts), dtype=np.int64, count=len(bouts))
+    pairs = np.array([(bout[1], bout[2]) for bout in bouts], dtype=np.int64)
+    scores = np.fromiter((bout[3] for bout in bouts), dtype=np.float64, count=len(bouts))
+
+    # dense positions for the boxer ids, so the state is three flat arrays
+    boxer_ids, positions = np.unique(pairs, return_inverse=True)
+    positions = positions.reshape(-1, 2)
+    mu = np.zeros(len(boxer_ids))
+    phi = np.full(len(boxer_ids), GLICKO_INITIAL_RD / GLICKO_SCALE)
+    sigma = np.full(len(boxer_ids), GLICKO_INITIAL_VOLATILITY)
+    seen = np.zeros(len(boxer_ids), dtype=bool)
+
+    # bouts arrive in date order, so each year with bouts is one contiguous slice. the years in between are
+    # empty periods, where every boxer rated so far only gains deviation
+    bounds = np.flatnonzero(np.diff(years)) + 1
+    previous_year = years[0] - 1
+    for period in np.split(np.arange(len(bouts)), bounds):
+        year = years[period[0]]
+        inflate_idle(phi, sigma, seen, year - previous_year - 1)
+        rate_period(mu, phi, sigma, seen, positions[period, 0], positions[period, 1], scores[period])
+        previous_year = year
+    periods = int(years[-1] - years[0]) + 1
+
+    rows = zip(boxer_ids.tolist(), (BASE_RATING + GLICKO_SCALE * mu).tolist(), (GLICKO_SCALE * phi).tolist(),
+               sigma.tolist())
+    write_ratings(session, GLICKO_COLUMNS, list(rows))
+    DataVersion.bump(session)
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"glicko: rated {len(bouts)} bouts over {periods} yearly periods, "
+                 f"{len(boxer_ids)} boxers updated in {elapsed:.3f}s")
+    return {'bouts': len(bouts), 'periods': periods, 'boxers': len(boxer_ids), 'seconds': elapsed}
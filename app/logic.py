@@ -1,5 +1,9 @@
-# import ranking metrics for rating calculations
-from app.models import Boxer, RankingMetrics
+# import the in-process ratings snapshots for rating calculations
+from app.ratings import elo_ratings, glicko_ratings, glicko_deviations, trueskill_means, trueskill_deviations
+
+# import numpy for batch predictions, and the normal distribution for TrueSkill win probabilities
+import numpy as np
+from statistics import NormalDist
 
 # constants for use in the algorithms:
 
@@ -9,40 +13,26 @@ ELO_C = 10
 ELO_D = 400
 # default Glicko rating deviation if unavailable per fighter
 GLICKO_RATING_DEVIATION = 50
+# Glicko-2 scale factor between the Glicko rating scale and the internal mu/phi scale
+GLICKO_SCALE = 173.7178
 # Trueskill beta value (standard deviation)
 TRUESKILL_BETA = 100
+# Trueskill skill standard deviation before any bouts, and for fighters without a stored value
+TRUESKILL_SIGMA = 2 * TRUESKILL_BETA
+# rating gap above which the predicted method is a K.O., and the KO likelihood either side of it
+KO_RATING_GAP = 100
+PROB_KO_LARGE_GAP = 0.7
+PROB_KO_SMALL_GAP = 0.3
 
 """
 function to predict the fight winner with the elo algorithm:
 fighter 1 win probability = 1/(1 + c^((fighter b rating - fighter a rating) / d)))
 """
 def elo_winner(boxer_a, boxer_b):
-    # calculate fighter rating values to inject into the algorithm. baseline rating of 1500
-    # contribution of each fighter ranking metric to the overall rating is weighted based on importance
-    a = RankingMetrics.query.get(boxer_a.id)
-    b = RankingMetrics.query.get(boxer_b.id)
-
-    # error prevention and defaults to fall back to in the event of null values for any metric in the database
-    if not a:
-        win_ratio_a = ko_ratio_a = 0.0
-        wins_a = losses_a = 0
-    else:
-        win_ratio_a = a.win_ratio or 0.0
-        ko_ratio_a = a.ko_ratio or 0.0
-        wins_a = a.wins or 0
-        losses_a = a.losses or 0
-
-    if not b:
-        win_ratio_b = ko_ratio_b = 0.0
-        wins_b = losses_b = 0
-    else:
-        win_ratio_b = b.win_ratio or 0.0
-        ko_ratio_b = b.ko_ratio or 0.0
-        wins_b = b.wins or 0
-        losses_b = b.losses or 0
-
-    r_a = 1500 + (500 * win_ratio_a) + (250 * ko_ratio_a) + (5 * (wins_a - losses_a))
-    r_b = 1500 + (500 * win_ratio_b) + (250 * ko_ratio_b) + (5 * (wins_b - losses_b))
+    # fighter rating values to inject into the algorithm: the chronological Elo ratings replayed by app.elo_engine,
+    # read from the in-process ratings snapshot. boxers without a rated bout start at the baseline rating of 1500
+    r_a = elo_ratings.rating(boxer_a.id)
+    r_b = elo_ratings.rating(boxer_b.id)
 
     # calculation of fighter a and b win prob using the elo formula
     elo_prob_a = 1 / (1 + ELO_C ** ((r_b - r_a) / ELO_D))
@@ -87,4 +77,108 @@ def elo_winner(boxer_a, boxer_b):
             prob_ko = 0.3
             win_type = 'Decision'
             elo_prob = elo_prob_b
-            return winner_id, elo_prob, win_type, elo_differential, prob_ko
\ No newline at end of file
+            return winner_id, elo_prob, win_type, elo_differential, prob_ko
+
+
+# Glicko-2 g(phi), which discounts a result against an opponent whose rating is uncertain
+def g(phi):
+    return 1 / np.sqrt(1 + 3 * phi ** 2 / np.pi ** 2)
+
+
+# winner id, the winner's probability, method and KO likelihood from boxer_a's win probability and the rating gap,
+# decided the same way as in elo_winner
+def verdict(boxer_a, boxer_b, prob_a, rating_gap):
+    if prob_a >= 0.5:
+        winner_id, prob, winner_gap = boxer_a.id, prob_a, rating_gap
+    else:
+        winner_id, prob, winner_gap = boxer_b.id, 1 - prob_a, -rating_gap
+    if winner_gap > KO_RATING_GAP:
+        return winner_id, prob, 'K.O.', PROB_KO_LARGE_GAP
+    return winner_id, prob, 'Decision', PROB_KO_SMALL_GAP
+
+
+"""
+function to predict the fight winner with the Glicko-2 ratings written by app.glicko_engine:
+fighter 1 win probability = 1/(1 + e^(-g(phi) * (mu a - mu b))), phi combining both rating deviations
+boxers without a stored deviation count as GLICKO_RATING_DEVIATION. same return values as elo_winner
+"""
+def glicko_winner(boxer_a, boxer_b):
+    r_a = glicko_ratings.rating(boxer_a.id)
+    r_b = glicko_ratings.rating(boxer_b.id)
+    rd_a = glicko_deviations.rating(boxer_a.id)
+    rd_b = glicko_deviations.rating(boxer_b.id)
+    rd_a = GLICKO_RATING_DEVIATION if rd_a is None else rd_a
+    rd_b = GLICKO_RATING_DEVIATION if rd_b is None else rd_b
+
+    phi = np.hypot(rd_a, rd_b) / GLICKO_SCALE
+    glicko_prob_a = float(1 / (1 + np.exp(-g(phi) * (r_a - r_b) / GLICKO_SCALE)))
+
+    winner_id, glicko_prob, win_type, prob_ko = verdict(boxer_a, boxer_b, glicko_prob_a, r_a - r_b)
+    glicko_differential = f"Glicko rating disparity = {r_a - r_b:.2f} (RD {rd_a:.0f} / {rd_b:.0f})"
+    return winner_id, glicko_prob, win_type, glicko_differential, prob_ko
+
+
+# Elo ratings for an array of boxer ids from the snapshot arrays, and a mask of the ids the snapshot knows.
+# known boxers without a replayed rating get the snapshot default, as in elo_winner
+def lookup_ratings(boxer_ids):
+    _, ids, values, _ = elo_ratings.current()
+    ids = np.frombuffer(ids, dtype=np.int64)
+    values = np.frombuffer(values, dtype=np.float64)
+    if not len(ids):
+        return np.full(len(boxer_ids), np.nan), np.zeros(len(boxer_ids), dtype=bool)
+
+    # snapshot ids are sorted, so each lookup is a binary search
+    positions = np.minimum(np.searchsorted(ids, boxer_ids), len(ids) - 1)
+    found = ids[positions] == boxer_ids
+    values = np.where(np.isnan(values[positions]), elo_ratings.default, values[positions])
+    return np.where(found, values, np.nan), found
+
+
+"""
+batch version of elo_winner over many matchups at once: one vectorised pass over the ratings snapshot
+takes an (n, 2) array of (boxer_a_id, boxer_b_id) pairs and returns a dict of arrays with the same meaning as the
+elo_winner return values. pairs with an unknown boxer are flagged in the "valid" mask
+"""
+def predict_batch(pairs):
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    r_a, found_a = lookup_ratings(pairs[:, 0])
+    r_b, found_b = lookup_ratings(pairs[:, 1])
+
+    rating_gap = r_a - r_b
+    elo_prob_a = 1 / (1 + ELO_C ** (-rating_gap / ELO_D))
+    a_wins = elo_prob_a >= 0.5
+
+    # the winner's side of the gap decides the method, as in elo_winner
+    knockout = np.abs(rating_gap) > KO_RATING_GAP
+    return {
+        'boxer_a_id': pairs[:, 0],
+        'boxer_b_id': pairs[:, 1],
+        'valid': found_a & found_b,
+        'winner_id': np.where(a_wins, pairs[:, 0], pairs[:, 1]),
+        'win_probability': np.where(a_wins, elo_prob_a, 1 - elo_prob_a),
+        'win_type': np.where(knockout, 'K.O.', 'Decision'),
+        'prob_ko': np.where(knockout, PROB_KO_LARGE_GAP, PROB_KO_SMALL_GAP),
+        'rating_gap': rating_gap,
+    }
+
+
+"""
+function to predict the fight winner with the TrueSkill skills written by app.trueskill_engine:
+fighter 1 win probability = Phi((mu a - mu b) / sqrt(2 * beta^2 + sigma a^2 + sigma b^2))
+boxers without a stored skill count as the prior: the base rating with TRUESKILL_SIGMA.
+same return values as elo_winner, so the engines can be compared side by side
+"""
+def trueskill_winner(boxer_a, boxer_b):
+    mu_a = trueskill_means.rating(boxer_a.id)
+    mu_b = trueskill_means.rating(boxer_b.id)
+    sigma_a = trueskill_deviations.rating(boxer_a.id)
+    sigma_b = trueskill_deviations.rating(boxer_b.id)
+    sigma_a = TRUESKILL_SIGMA if sigma_a is None else sigma_a
+    sigma_b = TRUESKILL_SIGMA if sigma_b is None else sigma_b
+
+    spread = (2 * TRUESKILL_BETA ** 2 + sigma_a ** 2 + sigma_b ** 2) ** 0.5
+    trueskill_prob_a = NormalDist().cdf((mu_a - mu_b) / spread)
+
+    winner_id, trueskill_prob, win_type, prob_ko = verdict(boxer_a, boxer_b, trueskill_prob_a, mu_a - mu_b)
+    trueskill_differential = f"TrueSkill disparity = {mu_a - mu_b:.2f} (sigma {sigma_a:.0f} / {sigma_b:.0f})"
+    return winner_id, trueskill_prob, win_type, trueskill_differential, prob_ko
@@ -1,11 +1,23 @@
 # import the db from the app
 from app import db
 
+# import the dialect insert constructs for ON CONFLICT upserts
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+# INSERT construct for the connected database, which supports ON CONFLICT on the natural keys
+def upsert(session, model):
+    dialect = sqlite if session.get_bind().dialect.name == 'sqlite' else postgresql
+    return dialect.insert(model)
+
+
 class Boxer(db.Model):
     __tablename__ = 'boxers'
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.Text, nullable=False)
+    # normalised name (app.names.normalize_name), for matching names that differ in accents, suffixes or initials
+    name_key = db.Column(db.Text, index=True)
     photo = db.Column(db.Text, nullable=False)
     alias = db.Column(db.Text)
     birth_date = db.Column(db.Date)
@@ -18,6 +30,9 @@ class Boxer(db.Model):
     active_to = db.Column(db.Date)
     era = db.Column(db.Text)
 
+    # natural key, so loaders can insert with ON CONFLICT instead of checking first
+    __table_args__ = (db.Index('uq_boxers_name', 'name', unique=True),)
+
     # table relationships
     fights_as_a = db.relationship('Fight', foreign_keys='Fight.boxer_a_id', back_populates='boxer_a')
     fights_as_b = db.relationship('Fight', foreign_keys='Fight.boxer_b_id', back_populates='boxer_b')
@@ -30,16 +45,27 @@ class Fight(db.Model):
     __tablename__ = 'fights'
 
     id = db.Column(db.Integer, primary_key=True)
-    boxer_a_id = db.Column(db.Integer, db.ForeignKey('boxers.id'))
-    boxer_b_id = db.Column(db.Integer, db.ForeignKey('boxers.id'))
-    winner_id = db.Column(db.Integer, db.ForeignKey('boxers.id'))
-    date = db.Column(db.Date)
+    # indexed for the per-boxer fight lookups in /api/boxer/<id> and the resolver joins
+    boxer_a_id = db.Column(db.Integer, db.ForeignKey('boxers.id'), index=True)
+    boxer_b_id = db.Column(db.Integer, db.ForeignKey('boxers.id'), index=True)
+    winner_id = db.Column(db.Integer, db.ForeignKey('boxers.id'), index=True)
+    date = db.Column(db.Date, index=True)
     rounds_completed = db.Column(db.Text)
     method = db.Column(db.Text)
     location = db.Column(db.Text)
     title_fight = db.Column(db.Boolean)
     opponent_name = db.Column(db.Text, nullable=True)
     winner_name = db.Column(db.Text, nullable=True)
+    # canonical bout identity "<lower boxer id>-<higher boxer id>-<date>", shared by the rows scraped from
+    # both fighters' pages. only set once both boxer ids are known
+    bout_key = db.Column(db.Text, nullable=True)
+
+    # natural key of a fight from one boxer's record, so re-runs and parallel loaders cannot insert it twice
+    # bout_key is only ever matched for equality, so it gets a hash index
+    __table_args__ = (
+        db.Index('uq_fights_natural_key', 'date', 'boxer_a_id', 'opponent_name', unique=True),
+        db.Index('ix_fights_bout_key', 'bout_key', postgresql_using='hash'),
+    )
 
     # table relationships
     boxer_a = db.relationship('Boxer', foreign_keys=[boxer_a_id], back_populates='fights_as_a')
@@ -47,6 +73,19 @@ class Fight(db.Model):
     winner = db.relationship('Boxer', foreign_keys=[winner_id], back_populates='wins')
     statlines = db.relationship('Statline', back_populates='fight')
 
+    # filter for canonical bouts only: where mirror rows of a bout have not been merged yet, the lowest id stands for it
+    @classmethod
+    def canonical_filter(cls):
+        mirror = db.aliased(cls)
+        return db.or_(
+            cls.bout_key.is_(None),
+            ~db.select(mirror.id).where(mirror.bout_key == cls.bout_key, mirror.id < cls.id).exists())
+
+    # query over canonical bouts only
+    @classmethod
+    def canonical(cls):
+        return cls.query.filter(cls.canonical_filter())
+
 
 class Statline(db.Model):
     __tablename__ = 'statlines'
@@ -73,6 +112,11 @@ class RankingMetrics(db.Model):
     boxer_id = db.Column(db.Integer, db.ForeignKey('boxers.id'), primary_key=True)
     adjusted_z_score = db.Column(db.Float)
     elo_rating = db.Column(db.Float)
+    glicko_rating = db.Column(db.Float)
+    glicko_rd = db.Column(db.Float)
+    glicko_volatility = db.Column(db.Float)
+    trueskill_mu = db.Column(db.Float)
+    trueskill_sigma = db.Column(db.Float)
     performance_score = db.Column(db.Float)
     ko_ratio = db.Column(db.Float)
     win_ratio = db.Column(db.Float)
@@ -88,4 +132,42 @@ class RankingMetrics(db.Model):
 
 
     # table relationships
-    boxer = db.relationship('Boxer', back_populates='ranking')
\ No newline at end of file
+    boxer = db.relationship('Boxer', back_populates='ranking')
+
+
+# single-row stamp bumped by every scraper write, so in-process caches such as app.ratings know when to reload
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # current version, or 0 when nothing has been stamped yet
+    @classmethod
+    def current(cls, session):
+        return session.query(cls.version).filter_by(id=1).scalar() or 0
+
+    # increment the version in the caller's transaction, so it commits together with the data it describes
+    @classmethod
+    def bump(cls, session):
+        bumped = session.query(cls).filter_by(id=1).update({cls.version: cls.version + 1, cls.updated_at: db.func.now()},
+                                                          synchronize_session=False)
+        if not bumped:
+            session.add(cls(id=1, version=1))
+
+
+# how far each rating engine has replayed the fights table, so later runs only rate new bouts
+class RatingWatermark(db.Model):
+    __tablename__ = 'rating_watermarks'
+
+    engine = db.Column(db.Text, primary_key=True)
+    last_fight_id = db.Column(db.Integer)
+    last_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # forget every engine's position in the caller's transaction. used when fights that may already have been
+    # replayed are changed, so the next run replays the whole history instead of only the newer ids
+    @classmethod
+    def reset(cls, session):
+        session.query(cls).update({cls.last_fight_id: None, cls.last_date: None}, synchronize_session=False)
@@ -0,0 +1,143 @@
+# import general packages
+import re
+import heapq
+import unicodedata
+from collections import defaultdict
+
+# minimum trigram similarity for a fuzzy match to be accepted
+NAME_MATCH_THRESHOLD = 0.75
+# how far ahead of the runner-up the best candidate has to be, so near ties stay unresolved instead of guessed
+NAME_MATCH_MARGIN = 0.1
+# lowest similarity that still matters: a weaker candidate can neither be accepted nor come within the margin of one
+# that is, so it is never scored
+NAME_MATCH_FLOOR = NAME_MATCH_THRESHOLD - NAME_MATCH_MARGIN
+
+# wiki disambiguation suffixes such as "(boxer)" or "(American boxer)"
+PARENTHETICAL = re.compile(r'\([^)]*\)')
+# anything that is not a letter, digit or space
+PUNCTUATION = re.compile(r'[^a-z0-9 ]+')
+# generational suffixes, which tell a father from a son of the same name. spelled-out forms map to the short ones
+SUFFIXES = {'jr': 'jr', 'junior': 'jr', 'sr': 'sr', 'senior': 'sr', 'ii': 'ii', 'iii': 'iii', 'iv': 'iv'}
+
+
+"""
+Normalised name key: accents folded, lower case, parenthetical suffixes, punctuation and middle initials removed.
+"Joe L. Louis (boxer)" and "Joe Louis" share the key "joe louis".
+A generational suffix stays at the end of the key in its short form, so "Ken Norton Jr." and "Ken Norton, Junior"
+share "ken norton jr" while Ken Norton keeps "ken norton".
+"""
+def normalize_name(name):
+    if not name:
+        return None
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower()
+    name = PARENTHETICAL.sub(' ', name)
+    name = PUNCTUATION.sub(' ', name.replace("'", ''))
+    words = name.split()
+    suffix = SUFFIXES.get(words[-1]) if len(words) > 2 else None
+    if suffix:
+        words = words[:-1]
+    # single letters between the first and last name are initials
+    if len(words) > 2:
+        words = [words[0]] + [w for w in words[1:-1] if len(w) > 1] + [words[-1]]
+    if suffix:
+        words.append(suffix)
+    return ' '.join(words) or None
+
+
+# generational suffix at the end of a name key, or None
+def key_suffix(key):
+    last = key.rsplit(' ', 1)[-1]
+    return last if ' ' in key and last in SUFFIXES.values() else None
+
+
+# character trigrams of a name key, padded so the start and end of each word count
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+"""
+In-memory name -> boxer id index for resolving opponent and winner names.
+A name is tried as an exact match, then by its normalised key, then against the character-trigram index.
+A key scoring NAME_MATCH_FLOOR shares at least that fraction of the name's trigrams, so it shares one of the name's
+rarest trigrams too (prefix filtering). Only those posting lists are read, and the long ones of common trigrams
+(" jo", "son") are skipped, so a lookup scores the few keys that can match rather than every key with a trigram
+in common.
+A fuzzy match needs a Jaccard similarity of at least NAME_MATCH_THRESHOLD and a clear lead over the next candidate,
+and never crosses generations: only keys with the same suffix (or none) are candidates, so "Ken Norton Jr." is not
+matched to Ken Norton.
+"""
+class NameIndex:
+    def __init__(self, rows=()):
+        self.names = {}
+        self.keys = defaultdict(set)
+        self.postings = defaultdict(set)
+        self.key_trigrams = {}
+        for boxer_id, name in rows:
+            self.add(boxer_id, name)
+
+    def add(self, boxer_id, name):
+        self.names.setdefault(name, boxer_id)
+        key = normalize_name(name)
+        if not key:
+            return
+        self.keys[key].add(boxer_id)
+        if key not in self.key_trigrams:
+            self.key_trigrams[key] = trigrams(key)
+            for gram in self.key_trigrams[key]:
+                self.postings[gram].add(key)
+
+    # best matching key and its similarity score, or (None, 0.0). keys scoring below NAME_MATCH_FLOOR are not found
+    def best_key(self, key):
+        grams = trigrams(key)
+        # rounding down keeps one posting list more than strictly needed, never one fewer
+        prefix = len(grams) - int(NAME_MATCH_FLOOR * len(grams)) + 1
+        rarest = heapq.nsmallest(prefix, grams, key=lambda gram: len(self.postings.get(gram, ())))
+
+        suffix = key_suffix(key)
+        candidates = {candidate for gram in rarest for candidate in self.postings.get(gram, ())
+                      if key_suffix(candidate) == suffix}
+
+        scores = []
+        for candidate in candidates:
+            candidate_grams = self.key_trigrams[candidate]
+            shared = len(grams & candidate_grams)
+            scores.append((shared / (len(grams) + len(candidate_grams) - shared), candidate))
+
+        top = heapq.nlargest(2, scores)
+        if not top or top[0][0] < NAME_MATCH_FLOOR:
+            return None, 0.0
+        best_score, best = top[0]
+        if len(top) > 1 and best_score - top[1][0] < NAME_MATCH_MARGIN:
+            return None, best_score
+        return best, best_score
+
+    # boxer id for an exact name, or None
+    def exact(self, name):
+        return self.names.get(name)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    # boxer id for a scraped name, or None when there is no confident match
+    def resolve(self, name):
+        if not name:
+            return None
+        if name in self.names:
+            return self.names[name]
+
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key not in self.keys:
+            key, score = self.best_key(key)
+            if key is None or score < NAME_MATCH_THRESHOLD:
+                return None
+
+        # a key shared by different boxers is ambiguous
+        ids = self.keys[key]
+        return next(iter(ids)) if len(ids) == 1 else None
+
+    def __len__(self):
+        return len(self.names)
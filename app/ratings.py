@@ -0,0 +1,90 @@
+# import general packages
+import math
+import time
+import threading
+from array import array
+
+# import the models the ratings are derived from
+from app.models import db, Boxer, RankingMetrics, DataVersion
+
+# seconds between data version checks. in between, predictions never touch the database
+RATINGS_RECHECK_SECONDS = 30
+
+# rating of a boxer before any rated bout, shared by the rating engines
+BASE_RATING = 1500
+
+
+# row loader for one stored ranking_metrics column, such as a rating engine's output. boxers without a value get None
+def metric_rows(column):
+    def rows(session):
+        return (session.query(Boxer.id, column)
+                .outerjoin(RankingMetrics, RankingMetrics.boxer_id == Boxer.id)
+                .order_by(Boxer.id).all())
+    return rows
+
+
+"""
+In-process snapshot of one rating column for every boxer, held in compact arrays (boxer ids and ratings side by side,
+plus an id -> position map). rows loads (boxer_id, rating) pairs in id order, e.g. metric_rows(column).
+It is loaded with one query on first use and reloaded only when the data_version stamp bumped by the scraper has
+moved, checked at most every RATINGS_RECHECK_SECONDS. Reads swap in a complete new state at once, so request threads
+never see a half-loaded snapshot. Boxers without a value, and ids the snapshot has not loaded yet, read back as the
+snapshot's default until the next data version check picks them up.
+"""
+class RatingsSnapshot:
+    def __init__(self, rows, default=BASE_RATING, recheck_seconds=RATINGS_RECHECK_SECONDS):
+        self.rows = rows
+        self.default = default
+        self.recheck_seconds = recheck_seconds
+        self.lock = threading.Lock()
+        # (version, ids, ratings, positions)
+        self.state = None
+        self.checked_at = 0.0
+
+    def load(self):
+        version = DataVersion.current(db.session)
+        rows = self.rows(db.session)
+
+        ids = array('q', (row[0] for row in rows))
+        ratings = array('d', (math.nan if row[1] is None else row[1] for row in rows))
+        positions = {boxer_id: i for i, boxer_id in enumerate(ids)}
+        self.state = (version, ids, ratings, positions)
+        self.checked_at = time.monotonic()
+
+    # reload when the data version has changed, checking at most every recheck_seconds unless forced
+    def refresh(self, force=False):
+        if not force and self.state and time.monotonic() - self.checked_at < self.recheck_seconds:
+            return
+        with self.lock:
+            if not force and self.state and time.monotonic() - self.checked_at < self.recheck_seconds:
+                return
+            if self.state and DataVersion.current(db.session) == self.state[0]:
+                self.checked_at = time.monotonic()
+                return
+            self.load()
+
+    # current state, loading or refreshing it first when due
+    def current(self):
+        self.refresh()
+        return self.state
+
+    # rating of one boxer, or the default for an id the snapshot does not hold. a miss never reaches the database
+    def rating(self, boxer_id):
+        _, _, ratings, positions = self.current()
+        position = positions.get(boxer_id)
+        if position is None or math.isnan(ratings[position]):
+            return self.default
+        return ratings[position]
+
+    @property
+    def version(self):
+        return self.current()[0]
+
+
+# shared snapshots used by app.logic. elo_winner reads the ratings replayed by app.elo_engine, and boxers it has
+# not rated yet count as the base rating
+elo_ratings = RatingsSnapshot(metric_rows(RankingMetrics.elo_rating), default=float(BASE_RATING))
+glicko_ratings = RatingsSnapshot(metric_rows(RankingMetrics.glicko_rating), default=float(BASE_RATING))
+glicko_deviations = RatingsSnapshot(metric_rows(RankingMetrics.glicko_rd), default=None)
+trueskill_means = RatingsSnapshot(metric_rows(RankingMetrics.trueskill_mu), default=float(BASE_RATING))
+trueskill_deviations = RatingsSnapshot(metric_rows(RankingMetrics.trueskill_sigma), default=None)
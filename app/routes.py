@@ -1,7 +1,20 @@
-from flask import Blueprint, render_template, session, redirect, url_for, request, jsonify
+from flask import Blueprint, render_template, session, redirect, url_for, request, jsonify, Response
 from app.models import Boxer, db, RankingMetrics, Fight
 from sqlalchemy import text, or_
-from app.logic import elo_winner
+from app.logic import elo_winner, glicko_winner, trueskill_winner, predict_batch
+from app.ratings import elo_ratings
+import json
+
+# largest number of matchups accepted by one batch prediction request
+MAX_BATCH_PAIRS = 100000
+# boxer ids are looked up as int64, so ids outside this range cannot name a boxer
+BOXER_ID_RANGE = range(-2 ** 63, 2 ** 63)
+# rating engines selectable on the results screen, by form value
+ENGINES = {
+    'elo': ('Elo', elo_winner),
+    'glicko': ('Glicko-2', glicko_winner),
+    'trueskill': ('TrueSkill', trueskill_winner),
+}
 
 main = Blueprint('main', __name__)
 
@@ -9,7 +22,7 @@ main = Blueprint('main', __name__)
 @main.route('/')
 def select():
     boxers = Boxer.query.order_by(Boxer.name).all()
-    return render_template('select.html', boxers=boxers)
+    return render_template('select.html', boxers=boxers, engines=ENGINES)
 
 # SCRAPPED: transition page with animated elements and sound effect
 @main.route('/transition', methods = ['POST'])
@@ -28,13 +41,20 @@ def results():
     boxer_a = Boxer.query.get(boxer_a_id)
     boxer_b = Boxer.query.get(boxer_b_id)
 
-    winner_id, elo_prob, win_type, elo_differential, prob_ko = elo_winner(boxer_a, boxer_b)
+    # rating engine chosen on the select screen, Elo when missing or unknown
+    engine = request.form.get('engine', 'elo')
+    if engine not in ENGINES:
+        engine = 'elo'
+    engine_name, predict = ENGINES[engine]
+
+    winner_id, elo_prob, win_type, elo_differential, prob_ko = predict(boxer_a, boxer_b)
 
     winner_name = boxer_a.name if winner_id == boxer_a.id else boxer_b.name
 
     return render_template('results.html', boxer_a=boxer_a, boxer_b=boxer_b, boxer_a_id=boxer_a_id,
                            boxer_b_id=boxer_b_id, winner_name = winner_name, prob_ko = prob_ko, win_type = win_type,
-                           elo_differential = elo_differential, percentage_victory = round(elo_prob * 100, 1))
+                           elo_differential = elo_differential, percentage_victory = round(elo_prob * 100, 1),
+                           engine_name = engine_name)
 
 
 # GET API to return a JSON object with fighter details for use with JavaScript
@@ -45,7 +65,8 @@ def get_boxer(boxer_id):
     if not boxer:
         return jsonify({'error': 'Boxer not found'}), 404
     ranking = RankingMetrics.query.get(boxer_id)
-    fights = Fight.query.filter(or_(Fight.boxer_a_id == boxer_id, Fight.boxer_b_id == boxer_id)).all()
+    # canonical bouts only, so a fight scraped from both fighters' pages is listed once
+    fights = Fight.canonical().filter(or_(Fight.boxer_a_id == boxer_id, Fight.boxer_b_id == boxer_id)).all()
 
     # convert the fights into a list of dictionaries
     fight_data = []
@@ -72,6 +93,10 @@ def get_boxer(boxer_id):
         'stance': boxer.stance,
         'adjusted_z_score': ranking.adjusted_z_score if ranking else None,
         'elo_rating': ranking.elo_rating if ranking else None,
+        'glicko_rating': ranking.glicko_rating if ranking else None,
+        'glicko_rd': ranking.glicko_rd if ranking else None,
+        'trueskill_mu': ranking.trueskill_mu if ranking else None,
+        'trueskill_sigma': ranking.trueskill_sigma if ranking else None,
         'performance_score': ranking.performance_score if ranking else None,
         'ko_ratio': ranking.ko_ratio if ranking else None,
         'win_ratio': ranking.win_ratio if ranking else None,
@@ -89,6 +114,46 @@ def get_boxer(boxer_id):
     })
 
 
+# JSON true/false parse as Python bools, which are ints too, so they are ruled out explicitly
+def is_boxer_id(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value in BOXER_ID_RANGE
+
+
+# POST API to predict many matchups at once, for the what-if dashboards
+# body: {"pairs": [[boxer_a_id, boxer_b_id], ...]}. returns one JSON object, or one JSON line per matchup
+# when ?format=ndjson is given or application/x-ndjson is accepted
+@main.route('/api/predict/batch', methods=['POST'])
+def predict_batch_api():
+    body = request.get_json(silent=True) or {}
+    pairs = body.get('pairs') if isinstance(body, dict) else body
+    if not isinstance(pairs, list) or not pairs:
+        return jsonify({'error': 'Expected a non-empty list of [boxer_a_id, boxer_b_id] pairs'}), 400
+    if len(pairs) > MAX_BATCH_PAIRS:
+        return jsonify({'error': f'At most {MAX_BATCH_PAIRS} pairs per request'}), 400
+    if not all(isinstance(pair, list) and len(pair) == 2 and all(is_boxer_id(i) for i in pair) for pair in pairs):
+        return jsonify({'error': 'Each pair must be two integer boxer ids'}), 400
+
+    result = predict_batch(pairs)
+    # plain Python lists per column, so building each row is a zip rather than per-value numpy conversions
+    columns = {name: values.tolist() for name, values in result.items()}
+    names = list(columns)
+    rows = (dict(zip(names, values)) for values in zip(*columns.values()))
+
+    def prediction(row):
+        if not row.pop('valid'):
+            return {'boxer_a_id': row['boxer_a_id'], 'boxer_b_id': row['boxer_b_id'], 'error': 'Boxer not found'}
+        row['win_probability'] = round(row['win_probability'], 4)
+        row['rating_gap'] = round(row['rating_gap'], 2)
+        return row
+
+    ndjson = request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+    if ndjson:
+        return Response((json.dumps(prediction(row)) + "\n" for row in rows), mimetype='application/x-ndjson')
+
+    return jsonify({'ratings_version': elo_ratings.version, 'predictions': [prediction(row) for row in rows]})
+
+
 # test to confirm Supabase connection is functional
 @main.route('/test-db')
 def test_db():
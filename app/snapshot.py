@@ -0,0 +1,103 @@
+# import general packages
+import os
+import time
+import threading
+import click
+
+# import SQLAlchemy engine and query constructs
+from sqlalchemy import create_engine, select, text
+
+# import the table definitions shared with the live database
+from app.models import db
+
+# rows copied per round trip
+EXPORT_CHUNK_SIZE = 5000
+# default snapshot location
+DEFAULT_SNAPSHOT_PATH = "snapshot.db"
+# seconds between checks of the served snapshot file for a replacement
+SNAPSHOT_RECHECK_SECONDS = 5
+
+"""
+Export of the live database to a single SQLite file for read-only serving.
+The data only changes when the scraper runs, so the web app can serve /results and /api/boxer from a local file
+instead of paying network round trips to the remote database on every request.
+The snapshot is built from the same models, so it gets the same tables and indexes, and is written to a temporary
+file that replaces the old snapshot only once it is complete. A running server never sees a half-written file.
+"""
+def export_snapshot(path=DEFAULT_SNAPSHOT_PATH, source_url=None):
+    if source_url is None:
+        from config import DATABASE_URL
+        source_url = DATABASE_URL
+
+    temporary = path + ".tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+
+    source = create_engine(source_url)
+    target = create_engine(f"sqlite:///{temporary}")
+    db.metadata.create_all(target)
+
+    counts = {}
+    start = time.perf_counter()
+    with source.connect() as source_conn, target.begin() as target_conn:
+        # parents before children, so foreign keys always point at rows that are already there
+        for table in db.metadata.sorted_tables:
+            counts[table.name] = 0
+            result = source_conn.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE).execute(
+                select(table))
+            for rows in result.partitions():
+                target_conn.execute(table.insert(), [dict(row._mapping) for row in rows])
+                counts[table.name] += len(rows)
+        target_conn.execute(text("ANALYZE"))
+
+    source.dispose()
+    target.dispose()
+    os.replace(temporary, path)
+    return counts, time.perf_counter() - start
+
+
+"""
+Reopening of the served snapshot after export-snapshot replaces it. os.replace gives the path a new file, but pooled
+SQLite connections keep reading the old, unlinked one. Before a request, at most every recheck_seconds, the inode
+and modification time of the path are compared with the last ones seen, and the engine's pool is disposed when they
+differ, so the next query opens the new file. The ratings snapshots then find its new data version and reload.
+"""
+class SnapshotWatcher:
+    def __init__(self, path, recheck_seconds=SNAPSHOT_RECHECK_SECONDS):
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self.lock = threading.Lock()
+        self.signature = self.stat()
+        self.checked_at = time.monotonic()
+
+    # (inode, mtime) of the snapshot file, or None while it is missing
+    def stat(self):
+        try:
+            status = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return status.st_ino, status.st_mtime_ns
+
+    # dispose the engine's connections if the file has been replaced, returning whether it had
+    def check(self, engine):
+        if time.monotonic() - self.checked_at < self.recheck_seconds:
+            return False
+        with self.lock:
+            if time.monotonic() - self.checked_at < self.recheck_seconds:
+                return False
+            self.checked_at = time.monotonic()
+            signature = self.stat()
+            if signature == self.signature:
+                return False
+            self.signature = signature
+        engine.dispose()
+        return True
+
+
+@click.command('export-snapshot')
+@click.argument('path', default=DEFAULT_SNAPSHOT_PATH)
+def export_snapshot_command(path):
+    """Write the boxers, fights, ranking_metrics and statlines tables to a SQLite snapshot."""
+    counts, elapsed = export_snapshot(path)
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    click.echo(f"Exported {summary} to {path} in {elapsed:.1f}s. Serve it with SNAPSHOT_PATH={path}")
@@ -0,0 +1,176 @@
+# import general packages
+import time
+import logging
+from statistics import NormalDist
+
+# import numpy for the array-backed factor messages
+import numpy as np
+
+# import query constructs
+from sqlalchemy import update
+
+# import the models the engine writes
+from app.models import RankingMetrics, DataVersion
+
+# import the bout selection, scoring and bulk write shared with the Elo replay
+from app.elo_engine import ratable_bouts, bout_score, write_ratings
+
+# import the baseline rating and the TrueSkill constants shared with trueskill_winner
+from app.ratings import BASE_RATING
+from app.logic import TRUESKILL_BETA, TRUESKILL_SIGMA
+
+# message passing stops once no boxer's mean moves by more than this many rating points in a sweep
+TRUESKILL_TOLERANCE = 0.01
+# upper bound on sweeps over the fight graph
+TRUESKILL_MAX_SWEEPS = 50
+# below this, a Gaussian tail probability is treated as zero and the limiting form of the update is used
+TINY = 2.22e-162
+# columns written to ranking_metrics
+TRUESKILL_COLUMNS = ('trueskill_mu', 'trueskill_sigma')
+
+
+# standard normal density and distribution function over arrays. numpy has no erf, so the cdf uses the
+# Chebyshev-fitted erfc from Numerical Recipes (relative error below 1.2e-7 everywhere)
+def norm_pdf(x):
+    return np.exp(-x * x / 2) / np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x):
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + z / 2)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, 1 - erfc / 2, erfc / 2)
+
+
+# TrueSkill mean and variance corrections v, w for a win by the first boxer, with t the scaled mean difference
+# and margin the scaled draw margin
+def win_corrections(t, margin):
+    x = t - margin
+    denominator = norm_cdf(x)
+    safe = denominator > TINY
+    v = np.where(safe, norm_pdf(x) / np.where(safe, denominator, 1), -x)
+    return v, np.clip(v * (v + x), 0, 1)
+
+
+# the same for a draw
+def draw_corrections(t, margin):
+    upper = margin - t
+    lower = -margin - t
+    denominator = norm_cdf(upper) - norm_cdf(lower)
+    safe = denominator > TINY
+    denominator = np.where(safe, denominator, 1)
+    v = np.where(safe, (norm_pdf(lower) - norm_pdf(upper)) / denominator, np.where(t < 0, -t - margin, -t + margin))
+    w = np.where(safe, v ** 2 + (upper * norm_pdf(upper) - lower * norm_pdf(lower)) / denominator, 1)
+    return v, np.clip(w, 0, 1)
+
+
+# scaled draw margin for the observed share of drawn bouts
+def draw_margin(draw_probability):
+    if draw_probability <= 0:
+        return 0.0
+    return NormalDist().inv_cdf((min(draw_probability, 0.99) + 1) / 2) * np.sqrt(2) * TRUESKILL_BETA
+
+
+"""
+Schedule of the bouts into rounds where no boxer appears twice, so every round can be updated as one array operation
+with the same result as visiting its bouts one by one. Bouts are placed greedily in date order, each in the first
+round after the last ones of both its boxers, so a sweep still walks every career forwards.
+"""
+def schedule_rounds(first, second, boxers):
+    next_round = np.zeros(boxers, dtype=np.int64)
+    rounds = np.empty(len(first), dtype=np.int64)
+    for k, (i, j) in enumerate(zip(first.tolist(), second.tolist())):
+        r = max(next_round[i], next_round[j])
+        rounds[k] = r
+        next_round[i] = next_round[j] = r + 1
+    order = np.argsort(rounds, kind='stable')
+    return np.split(order, np.flatnonzero(np.diff(rounds[order])) + 1)
+
+
+"""
+TrueSkill over the whole fight graph by expectation propagation. Every boxer has one skill for their whole career,
+with a N(BASE_RATING, TRUESKILL_SIGMA^2) prior, and every ratable bout is a factor between the two boxers' skills:
+performances are skill plus N(0, TRUESKILL_BETA^2) noise, the winner outperforms the loser by more than the draw
+margin, and a draw (Fight.method == 'Draw') keeps them within it. The margin comes from the observed share of draws.
+Factor storage is sparse and array-backed: each bout holds the positions of its two boxers and the Gaussian message
+(precision and precision-adjusted mean) it sends to each of them, so memory grows with the bout count and the
+marginals are the prior plus a bincount of the messages. A sweep updates every factor against the cavity marginals
+(the marginal without that factor's own message), round by round, until no mean moves by TRUESKILL_TOLERANCE.
+"""
+def replay_trueskill(session):
+    start = time.perf_counter()
+    bouts = [(boxer_a_id, boxer_b_id, bout_score(boxer_a_id, boxer_b_id, winner_id, method))
+             for _, _, boxer_a_id, boxer_b_id, winner_id, method in ratable_bouts(session)]
+    bouts = [bout for bout in bouts if bout[2] is not None]
+
+    session.execute(update(RankingMetrics).values(trueskill_mu=None, trueskill_sigma=None))
+    if not bouts:
+        DataVersion.bump(session)
+        return {'bouts': 0, 'sweeps': 0, 'boxers': 0, 'seconds': time.perf_counter() - start}
+
+    # winner first, so one factor type covers wins and the orientation of draws does not matter
+    pairs = np.array([(a, b) if score >= 0.5 else (b, a) for a, b, score in bouts], dtype=np.int64)
+    draws = np.fromiter((score == 0.5 for _, _, score in bouts), dtype=bool, count=len(bouts))
+    boxer_ids, positions = np.unique(pairs, return_inverse=True)
+    positions = positions.reshape(-1, 2)
+    first, second = positions[:, 0], positions[:, 1]
+    margin = draw_margin(draws.mean())
+
+    # messages from each bout factor to its first and second boxer, in natural parameters
+    message_pi = np.zeros((len(bouts), 2))
+    message_tau = np.zeros((len(bouts), 2))
+    prior_pi = 1 / TRUESKILL_SIGMA ** 2
+    prior_tau = BASE_RATING * prior_pi
+    pi = np.full(len(boxer_ids), prior_pi)
+    tau = np.full(len(boxer_ids), prior_tau)
+
+    rounds = schedule_rounds(first, second, len(boxer_ids))
+    two_beta2 = 2 * TRUESKILL_BETA ** 2
+    sweeps = 0
+    for sweeps in range(1, TRUESKILL_MAX_SWEEPS + 1):
+        previous = tau / pi
+        for r in rounds:
+            i, j = first[r], second[r]
+            cavity_pi_i = pi[i] - message_pi[r, 0]
+            cavity_pi_j = pi[j] - message_pi[r, 1]
+            cavity_tau_i = tau[i] - message_tau[r, 0]
+            cavity_tau_j = tau[j] - message_tau[r, 1]
+            var_i = 1 / cavity_pi_i
+            var_j = 1 / cavity_pi_j
+            mu_i = cavity_tau_i * var_i
+            mu_j = cavity_tau_j * var_j
+
+            c = np.sqrt(two_beta2 + var_i + var_j)
+            t = (mu_i - mu_j) / c
+            v_win, w_win = win_corrections(t, margin / c)
+            v_draw, w_draw = draw_corrections(t, margin / c)
+            v = np.where(draws[r], v_draw, v_win)
+            w = np.where(draws[r], w_draw, w_win)
+
+            new_pi_i = 1 / (var_i * (1 - var_i / c ** 2 * w))
+            new_pi_j = 1 / (var_j * (1 - var_j / c ** 2 * w))
+            new_tau_i = (mu_i + var_i / c * v) * new_pi_i
+            new_tau_j = (mu_j - var_j / c * v) * new_pi_j
+
+            message_pi[r, 0] = new_pi_i - cavity_pi_i
+            message_pi[r, 1] = new_pi_j - cavity_pi_j
+            message_tau[r, 0] = new_tau_i - cavity_tau_i
+            message_tau[r, 1] = new_tau_j - cavity_tau_j
+            pi[i], pi[j] = new_pi_i, new_pi_j
+            tau[i], tau[j] = new_tau_i, new_tau_j
+
+        # rebuild the marginals from the stored messages, so rounding never accumulates across sweeps
+        pi = prior_pi + np.bincount(positions.ravel(), weights=message_pi.ravel(), minlength=len(boxer_ids))
+        tau = prior_tau + np.bincount(positions.ravel(), weights=message_tau.ravel(), minlength=len(boxer_ids))
+        if np.max(np.abs(tau / pi - previous)) < TRUESKILL_TOLERANCE:
+            break
+
+    rows = zip(boxer_ids.tolist(), (tau / pi).tolist(), (1 / np.sqrt(pi)).tolist())
+    write_ratings(session, TRUESKILL_COLUMNS, list(rows))
+    DataVersion.bump(session)
+
+    elapsed = time.perf_counter() - start
+    logging.info(f"trueskill: {sweeps} sweeps over {len(bouts)} bouts in {len(rounds)} rounds, "
+                 f"{len(boxer_ids)} boxers updated in {elapsed:.3f}s")
+    return {'bouts': len(bouts), 'sweeps': sweeps, 'boxers': len(boxer_ids), 'seconds': elapsed}
@@ -14,4 +14,7 @@ DBNAME = os.getenv("dbname")
 # database URL
 DATABASE_URL = (
     f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}?sslmode=require"
-)
\ No newline at end of file
+)
+
+# optional SQLite snapshot written by `flask export-snapshot`. when set, the web app serves read-only from it
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
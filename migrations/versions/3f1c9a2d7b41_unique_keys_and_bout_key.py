@@ -0,0 +1,39 @@
+"""unique keys and canonical bout key
+
+Unique indexes on boxers.name and on the fight natural key (date, boxer_a_id, opponent_name), used by the
+ON CONFLICT inserts, and the bout_key column with its hash index.
+Boxers or fights already stored twice are folded into their lowest id first (app.duplicates), so the unique
+indexes can be created on a database that was filled before they existed.
+
+Revision ID: 3f1c9a2d7b41
+Revises: 67ca86366aff
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.duplicates import fold_duplicate_keys
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a2d7b41'
+down_revision = '67ca86366aff'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    fold_duplicate_keys(op.get_bind())
+
+    op.add_column('fights', sa.Column('bout_key', sa.Text(), nullable=True))
+    op.create_index('uq_boxers_name', 'boxers', ['name'], unique=True)
+    op.create_index('uq_fights_natural_key', 'fights', ['date', 'boxer_a_id', 'opponent_name'], unique=True)
+    op.create_index('ix_fights_bout_key', 'fights', ['bout_key'], postgresql_using='hash')
+
+
+def downgrade():
+    op.drop_index('ix_fights_bout_key', table_name='fights')
+    op.drop_index('uq_fights_natural_key', table_name='fights')
+    op.drop_index('uq_boxers_name', table_name='boxers')
+    op.drop_column('fights', 'bout_key')
@@ -0,0 +1,35 @@
+"""indexes for the hot fight queries
+
+B-tree indexes on the fights columns filtered by /api/boxer/<id> (boxer_a_id OR boxer_b_id), the resolver
+and rating joins (winner_id) and date ordered replays (date). Lookups by boxers.name are already served by the
+uq_boxers_name unique index from the previous revision.
+Compare the query plans before and after with scraper/query_plans.py.
+
+Revision ID: 8b2e4d6f0a13
+Revises: 3f1c9a2d7b41
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f0a13'
+down_revision = '3f1c9a2d7b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_fights_boxer_a_id', 'fights', ['boxer_a_id'], if_not_exists=True)
+    op.create_index('ix_fights_boxer_b_id', 'fights', ['boxer_b_id'], if_not_exists=True)
+    op.create_index('ix_fights_winner_id', 'fights', ['winner_id'], if_not_exists=True)
+    op.create_index('ix_fights_date', 'fights', ['date'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_fights_date', table_name='fights')
+    op.drop_index('ix_fights_winner_id', table_name='fights')
+    op.drop_index('ix_fights_boxer_b_id', table_name='fights')
+    op.drop_index('ix_fights_boxer_a_id', table_name='fights')
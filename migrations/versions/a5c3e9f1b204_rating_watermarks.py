@@ -0,0 +1,32 @@
+"""rating watermarks
+
+One row per rating engine recording the last fight it replayed, so rating runs only apply bouts added since.
+
+Revision ID: a5c3e9f1b204
+Revises: e2d8f3a6c1b7
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c3e9f1b204'
+down_revision = 'e2d8f3a6c1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rating_watermarks',
+    sa.Column('engine', sa.Text(), nullable=False),
+    sa.Column('last_fight_id', sa.Integer(), nullable=True),
+    sa.Column('last_date', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('engine')
+    )
+
+
+def downgrade():
+    op.drop_table('rating_watermarks')
@@ -0,0 +1,30 @@
+"""glicko ratings
+
+Glicko-2 rating, deviation and volatility per boxer on ranking_metrics, written by app.glicko_engine.
+
+Revision ID: b7d2f4a8c6e3
+Revises: a5c3e9f1b204
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2f4a8c6e3'
+down_revision = 'a5c3e9f1b204'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ranking_metrics', sa.Column('glicko_rating', sa.Float(), nullable=True))
+    op.add_column('ranking_metrics', sa.Column('glicko_rd', sa.Float(), nullable=True))
+    op.add_column('ranking_metrics', sa.Column('glicko_volatility', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ranking_metrics', 'glicko_volatility')
+    op.drop_column('ranking_metrics', 'glicko_rd')
+    op.drop_column('ranking_metrics', 'glicko_rating')
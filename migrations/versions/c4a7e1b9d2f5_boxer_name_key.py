@@ -0,0 +1,37 @@
+"""normalised boxer name key
+
+boxers.name_key holds app.names.normalize_name(name), indexed, for resolving opponent and winner names that
+differ in accents, suffixes or initials. Existing boxers are backfilled.
+
+Revision ID: c4a7e1b9d2f5
+Revises: 8b2e4d6f0a13
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.names import normalize_name
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e1b9d2f5'
+down_revision = '8b2e4d6f0a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('boxers', sa.Column('name_key', sa.Text(), nullable=True))
+    op.create_index('ix_boxers_name_key', 'boxers', ['name_key'])
+
+    bind = op.get_bind()
+    rows = [{'boxer_id': boxer_id, 'name_key': normalize_name(name)}
+            for boxer_id, name in bind.execute(sa.text("SELECT id, name FROM boxers"))]
+    if rows:
+        bind.execute(sa.text("UPDATE boxers SET name_key = :name_key WHERE id = :boxer_id"), rows)
+
+
+def downgrade():
+    op.drop_index('ix_boxers_name_key', table_name='boxers')
+    op.drop_column('boxers', 'name_key')
@@ -0,0 +1,28 @@
+"""trueskill ratings
+
+TrueSkill skill mean and standard deviation per boxer on ranking_metrics, written by app.trueskill_engine.
+
+Revision ID: d9f1a3c5e7b8
+Revises: b7d2f4a8c6e3
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f1a3c5e7b8'
+down_revision = 'b7d2f4a8c6e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('ranking_metrics', sa.Column('trueskill_mu', sa.Float(), nullable=True))
+    op.add_column('ranking_metrics', sa.Column('trueskill_sigma', sa.Float(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('ranking_metrics', 'trueskill_sigma')
+    op.drop_column('ranking_metrics', 'trueskill_mu')
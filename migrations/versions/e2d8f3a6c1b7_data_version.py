@@ -0,0 +1,33 @@
+"""data version stamp
+
+Single-row data_version table bumped by every scraper write, so the web app's in-process ratings snapshot
+knows when to reload.
+
+Revision ID: e2d8f3a6c1b7
+Revises: c4a7e1b9d2f5
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2d8f3a6c1b7'
+down_revision = 'c4a7e1b9d2f5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_version = op.create_table('data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(data_version, [{'id': 1, 'version': 1}])
+
+
+def downgrade():
+    op.drop_table('data_version')
@@ -0,0 +1,35 @@
+"""suffix-aware name keys
+
+normalize_name now keeps generational suffixes (Jr, Sr, II, III, IV) in a fixed short form at the end of the key.
+Stored keys that differ from the new form are recomputed. Nothing changes in the schema.
+
+Revision ID: f4c2a7d9e1b3
+Revises: d9f1a3c5e7b8
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.names import normalize_name
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c2a7d9e1b3'
+down_revision = 'd9f1a3c5e7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    rows = [{'boxer_id': boxer_id, 'name_key': normalize_name(name)}
+            for boxer_id, name, name_key in bind.execute(sa.text("SELECT id, name, name_key FROM boxers"))
+            if normalize_name(name) != name_key]
+    if rows:
+        bind.execute(sa.text("UPDATE boxers SET name_key = :name_key WHERE id = :boxer_id"), rows)
+
+
+def downgrade():
+    # the older keys are only less precise, so they are left as they are
+    pass
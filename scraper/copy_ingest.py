@@ -0,0 +1,223 @@
+# import general packages
+import io
+import os
+import logging
+
+# import the standalone engine factory and the row mappings used by the regular insert path
+from db_session import get_engine
+from scraper import boxer_fields, ranking_fields, fight_row, load_batch, FIGHT_UPDATE_COLUMNS
+
+# import the name index used to resolve opponents and winners, as the regular insert path does
+from app.names import NameIndex
+
+# import .env loader setting
+from dotenv import load_dotenv
+load_dotenv()
+
+# loader used by the bulk ingest scripts: "orm" (load_batch) or "copy" (copy_load)
+INGEST_LOADER = os.getenv("INGEST_LOADER", "orm")
+# boxers per COPY load. each load is one transaction, so this can be far larger than an ORM batch
+COPY_BATCH_SIZE = 5000
+
+"""
+PostgreSQL COPY ingest for whole scrape runs. Instead of one ORM transaction per boxer, the boxers,
+ranking_metrics and fights rows of a whole batch are streamed into temporary staging tables with
+COPY FROM STDIN through psycopg2, then merged into the real tables with INSERT ... SELECT ... ON CONFLICT
+on their unique keys in a single transaction.
+Opponent and winner names are resolved through the same NameIndex as the regular insert path (exact name, normalised
+name key, then trigram match) against the roster loaded once after the boxers are merged, so fights against boxers
+in the same batch get their ids too. The ids are staged with the fights.
+"""
+
+# staging table column order, shared by the CREATE TABLE and COPY statements
+BOXER_COLUMNS = ['name', 'name_key', 'photo', 'alias', 'birth_date', 'stance', 'height_cm', 'reach_cm', 'active_from', 'active_to', 'era']
+RANKING_COLUMNS = ['ko_ratio', 'win_ratio', 'num_of_fights', 'wins', 'wins_by_ko', 'wins_by_decision', 'wins_by_dq',
+                   'losses', 'losses_by_ko', 'losses_by_decision', 'losses_by_dq']
+FIGHT_COLUMNS = ['date', 'rounds_completed', 'method', 'location', 'title_fight', 'opponent_name', 'winner_name']
+
+STAGING_TABLES = """
+    CREATE TEMP TABLE stage_boxers (
+        name TEXT, name_key TEXT, photo TEXT, alias TEXT, birth_date DATE, stance TEXT, height_cm INTEGER, reach_cm INTEGER,
+        active_from DATE, active_to DATE, era TEXT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE stage_ranking_metrics (
+        boxer_name TEXT, ko_ratio FLOAT, win_ratio FLOAT, num_of_fights FLOAT, wins INTEGER, wins_by_ko INTEGER,
+        wins_by_decision INTEGER, wins_by_dq INTEGER, losses INTEGER, losses_by_ko INTEGER,
+        losses_by_decision INTEGER, losses_by_dq INTEGER
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE stage_fights (
+        boxer_name TEXT, date DATE, rounds_completed TEXT, method TEXT, location TEXT, title_fight BOOLEAN,
+        opponent_name TEXT, winner_name TEXT, opponent_id INTEGER, winner_id INTEGER
+    ) ON COMMIT DROP;
+"""
+
+MERGE_BOXERS = f"""
+    INSERT INTO boxers ({', '.join(BOXER_COLUMNS)})
+    SELECT DISTINCT ON (s.name) {', '.join('s.' + c for c in BOXER_COLUMNS)}
+    FROM stage_boxers s
+    ORDER BY s.name
+    ON CONFLICT (name) DO {{action}}
+"""
+
+MERGE_RANKING_METRICS = f"""
+    INSERT INTO ranking_metrics (boxer_id, {', '.join(RANKING_COLUMNS)})
+    SELECT DISTINCT ON (b.id) b.id, {', '.join('s.' + c for c in RANKING_COLUMNS)}
+    FROM stage_ranking_metrics s
+    JOIN boxers b ON b.name = s.boxer_name
+    ORDER BY b.id
+    ON CONFLICT (boxer_id) DO {{action}}
+"""
+
+# one staged row per bout: both fighters of a bout can be in the same batch, and a page can list a bout twice.
+# rows are grouped by bout_key, or by their natural key while the opponent is unknown, and the row from the
+# lower boxer id is kept, so each bout is inserted once however many times it was staged
+STAGED_BOUT = ("COALESCE(k.bout_key, CAST(k.a_id AS TEXT) || '|' || COALESCE(CAST(k.date AS TEXT), '') "
+               "|| '|' || COALESCE(k.opponent_name, ''))")
+
+# bouts already stored as the mirror row from the opponent's page are left out by their bout_key.
+# {mirror} narrows that to rows from other pages on a refresh, so this boxer's own rows reach the ON CONFLICT update.
+# fights with no date or opponent never conflict on the unique index, since NULLs are distinct there, so stored
+# ones are left out explicitly. they are not refreshed by a COPY load, only by the ORM loader
+MERGE_FIGHTS = f"""
+    INSERT INTO fights (boxer_a_id, boxer_b_id, winner_id, bout_key, {', '.join(FIGHT_COLUMNS)})
+    SELECT DISTINCT ON ({STAGED_BOUT}) k.a_id, k.opponent_id, k.winner_id, k.bout_key, {', '.join('k.' + c for c in FIGHT_COLUMNS)}
+    FROM (
+        SELECT s.*, a.id AS a_id,
+               CASE WHEN s.opponent_id IS NOT NULL THEN
+                   CAST(LEAST(a.id, s.opponent_id) AS TEXT) || '-' || CAST(GREATEST(a.id, s.opponent_id) AS TEXT)
+                   || '-' || CAST(s.date AS TEXT)
+               END AS bout_key
+        FROM stage_fights s
+        JOIN boxers a ON a.name = s.boxer_name
+    ) k
+    WHERE (k.bout_key IS NULL OR NOT EXISTS (SELECT 1 FROM fights f WHERE f.bout_key = k.bout_key{{mirror}}))
+      AND NOT ((k.date IS NULL OR k.opponent_name IS NULL) AND EXISTS (
+          SELECT 1 FROM fights f WHERE f.boxer_a_id = k.a_id
+             AND f.date IS NOT DISTINCT FROM k.date AND f.opponent_name IS NOT DISTINCT FROM k.opponent_name))
+    ORDER BY {STAGED_BOUT}, k.a_id
+    ON CONFLICT (date, boxer_a_id, opponent_name) DO {{action}}
+"""
+
+
+# every boxer after the boxers merge, for the name index
+ROSTER = "SELECT id, name FROM boxers"
+
+# data version stamp read by the web app's ratings snapshot
+BUMP_DATA_VERSION = """
+    INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, now())
+    ON CONFLICT (id) DO UPDATE SET version = data_version.version + 1, updated_at = now()
+"""
+
+# refreshed fights may already have been rated, so an update load makes the next rating run a full replay
+RESET_WATERMARKS = "UPDATE rating_watermarks SET last_fight_id = NULL, last_date = NULL"
+
+
+# ON CONFLICT action: refresh every column from the staged row, or leave the stored row alone
+def conflict_action(columns, update):
+    if not update:
+        return 'NOTHING'
+    return 'UPDATE SET ' + ', '.join(f'{c} = EXCLUDED.{c}' for c in columns)
+
+
+# render one value in COPY text format
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, list):
+        # same representation psycopg2 gives the era list when it is stored through the ORM
+        value = '{' + ','.join(value) + '}'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+# render rows as an in-memory COPY text stream
+def copy_buffer(rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(copy_value(v) for v in row) + '\n')
+    buffer.seek(0)
+    return buffer
+
+
+# turn (data, fight_matrix) results into staging rows for the three tables. fight rows get their opponent and
+# winner ids from resolve_fight_ids once the boxers are merged
+def collect_rows(results):
+    boxers, metrics, fights = [], [], []
+    for data, fight_matrix in results:
+        if not data or not data.get('name'):
+            continue
+        name = data['name']
+
+        row = boxer_fields(data)
+        boxers.append([row[c] for c in BOXER_COLUMNS])
+
+        row = ranking_fields(data)
+        metrics.append([name] + [row[c] for c in RANKING_COLUMNS])
+
+        for fight_data in fight_matrix or []:
+            row = fight_row(fight_data, name)
+            fights.append([name] + [row[c] for c in FIGHT_COLUMNS])
+    return boxers, metrics, fights
+
+
+# append the opponent and winner ids to each staged fight row, resolving the names through the name index
+def resolve_fight_ids(fights, name_index):
+    opponent = 1 + FIGHT_COLUMNS.index('opponent_name')
+    winner = 1 + FIGHT_COLUMNS.index('winner_name')
+    return [row + [name_index.resolve(row[opponent]), name_index.resolve(row[winner])] for row in fights]
+
+
+"""
+Load a whole batch of extracted pages with COPY and merge it in one transaction.
+update=True also refreshes boxers, ranking_metrics and fights that are already stored, for re-extraction runs.
+"""
+def copy_load(results, update=False):
+    boxers, metrics, fights = collect_rows(results)
+    if not boxers:
+        logging.warning("No boxers to load.")
+        return
+
+    conn = get_engine().raw_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(STAGING_TABLES)
+
+        cur.copy_expert(f"COPY stage_boxers ({', '.join(BOXER_COLUMNS)}) FROM STDIN", copy_buffer(boxers))
+        cur.copy_expert(f"COPY stage_ranking_metrics (boxer_name, {', '.join(RANKING_COLUMNS)}) FROM STDIN",
+                        copy_buffer(metrics))
+
+        cur.execute(MERGE_BOXERS.format(action=conflict_action([c for c in BOXER_COLUMNS if c != 'name'], update)))
+        new_boxers = cur.rowcount
+        cur.execute(MERGE_RANKING_METRICS.format(action=conflict_action(RANKING_COLUMNS, update)))
+
+        # opponents and winners are resolved against the roster as it stands after the merge
+        cur.execute(ROSTER)
+        name_index = NameIndex(cur.fetchall())
+        cur.copy_expert(f"COPY stage_fights (boxer_name, {', '.join(FIGHT_COLUMNS)}, opponent_id, winner_id) FROM STDIN",
+                        copy_buffer(resolve_fight_ids(fights, name_index)))
+
+        cur.execute(MERGE_FIGHTS.format(action=conflict_action(FIGHT_UPDATE_COLUMNS, update),
+                                        mirror=' AND f.boxer_a_id <> k.a_id' if update else ''))
+        new_fights = cur.rowcount
+        if update:
+            cur.execute(RESET_WATERMARKS)
+        cur.execute(BUMP_DATA_VERSION)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    logging.info(f"COPY ingest: {len(boxers)} boxers staged, {new_boxers} written, "
+                 f"{len(fights)} fights staged, {new_fights} inserted")
+
+
+# batch loader and batch size for the given loader name, defaulting to INGEST_LOADER
+def batch_loader(loader=None, batch_size=None):
+    if (loader or INGEST_LOADER) == 'copy':
+        return copy_load, COPY_BATCH_SIZE
+    return load_batch, batch_size
@@ -0,0 +1,166 @@
+# import general packages
+import heapq
+import hashlib
+import logging
+import itertools
+
+# import category page fetching and pro-record classification from the link scraper
+from heavyweight_link_scraper import make_soup, contains_fight_table, BASE_URL
+
+# import concurrent fetching and the per-host rate limiter, which the fetch client applies to each request it sends
+from functools import partial
+from fetch_engine import fetch_concurrently, HostRateLimiter, MAX_WORKERS, REQUESTS_PER_SECOND
+
+# weight class categories to crawl
+CATEGORIES = [
+    "https://en.wikipedia.org/wiki/Category:Heavyweight_boxers",
+    "https://en.wikipedia.org/wiki/Category:Cruiserweight_boxers",
+    "https://en.wikipedia.org/wiki/Category:Light-heavyweight_boxers",
+    "https://en.wikipedia.org/wiki/Category:Super-middleweight_boxers",
+    "https://en.wikipedia.org/wiki/Category:Middleweight_boxers",
+]
+
+# how many levels of subcategories to follow below each configured category
+MAX_DEPTH = 1
+
+
+"""
+Compact visited set. URLs are stored as 64-bit blake2b digests rather than strings, which keeps the set
+small for tens of thousands of URLs. The chance of two URLs colliding at that size is negligible.
+"""
+class VisitedSet:
+    def __init__(self):
+        self.digests = set()
+
+    @staticmethod
+    def digest(url):
+        return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    # add a URL, returning False if it had already been seen
+    def add(self, url):
+        key = self.digest(url)
+        if key in self.digests:
+            return False
+        self.digests.add(key)
+        return True
+
+    def __len__(self):
+        return len(self.digests)
+
+
+"""
+Priority-queue crawl frontier over category pages. Entries are ordered by (depth, priority, insertion order):
+shallow categories are finished before their subcategories, and the continuation pages of a category
+("next page") are taken before any new category at the same depth.
+"""
+class CrawlFrontier:
+    # priorities within one depth level
+    CONTINUATION = 0
+    CATEGORY = 1
+
+    def __init__(self, max_depth=MAX_DEPTH):
+        self.max_depth = max_depth
+        self.heap = []
+        self.counter = itertools.count()
+        self.visited = VisitedSet()
+
+    def push(self, url, depth, priority=CATEGORY):
+        if depth > self.max_depth or not self.visited.add(url):
+            return
+        heapq.heappush(self.heap, (depth, priority, next(self.counter), url))
+
+    def pop(self):
+        depth, _, _, url = heapq.heappop(self.heap)
+        return url, depth
+
+    def __bool__(self):
+        return bool(self.heap)
+
+
+# links to wiki pages in one block of a category page, skipping help pages and the pagination links
+def block_links(block):
+    for link in block.find_all("a", href=True):
+        href = link["href"]
+        if href.startswith("/wiki/") and not href.startswith("/wiki/Help:"):
+            yield BASE_URL + href
+
+
+# the "next page" link of one block of a category page, if there is one
+def next_page_link(block):
+    next_page = block.find("a", string="next page")
+    if next_page and 'href' in next_page.attrs:
+        return BASE_URL + next_page["href"]
+    return None
+
+
+"""
+Walk the configured categories and their subcategories down to max_depth, yielding each boxer page URL
+the first time it is seen. Nothing is collected in memory beyond the frontier and the visited set,
+so the output can be streamed to a file or straight into the fetch stage.
+Category pages are fetched through the page cache, and every one that goes over the network takes a token from
+limiter, the same per-host limiter as the boxer pages classified alongside the crawl (the fetch client's default
+when None).
+"""
+def crawl(categories=CATEGORIES, max_depth=MAX_DEPTH, limiter=None):
+    frontier = CrawlFrontier(max_depth)
+    for category in categories:
+        frontier.push(category, 0)
+
+    pages = 0
+    while frontier:
+        url, depth = frontier.pop()
+        soup = make_soup(url, limiter)
+        if not soup:
+            continue
+
+        # subcategories go one level deeper
+        subcategories = soup.find("div", id="mw-subcategories")
+        if subcategories:
+            for link in block_links(subcategories):
+                if link.startswith(BASE_URL + "/wiki/Category:"):
+                    frontier.push(link, depth + 1)
+            continuation = next_page_link(subcategories)
+            if continuation:
+                frontier.push(continuation, depth, CrawlFrontier.CONTINUATION)
+
+        # boxer pages are streamed out as they are found
+        cat_block = soup.find("div", id="mw-pages")
+        if cat_block:
+            for link in block_links(cat_block):
+                if link.startswith(BASE_URL + "/wiki/Category:"):
+                    continue
+                if frontier.visited.add(link):
+                    pages += 1
+                    yield link
+            continuation = next_page_link(cat_block)
+            if continuation:
+                frontier.push(continuation, depth, CrawlFrontier.CONTINUATION)
+
+    logging.info(f"crawl frontier: {pages} boxer pages found, {len(frontier.visited)} URLs visited")
+
+
+"""
+Stream the frontier straight into the concurrent fetch stage, keeping only professional boxers, and write each
+one to urls.txt as soon as it is classified. The fetched pages stay in the page cache for the main scraper.
+URLs are written in the order they finish classifying, not in category order.
+requests_per_second caps category and boxer page requests together.
+"""
+def write_pro_urls(path="urls.txt", categories=CATEGORIES, max_depth=MAX_DEPTH, max_workers=MAX_WORKERS,
+                   requests_per_second=REQUESTS_PER_SECOND):
+    limiter = HostRateLimiter(rate=requests_per_second, burst=max_workers)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for url, is_pro in fetch_concurrently(crawl(categories, max_depth, limiter),
+                                              partial(contains_fight_table, limiter=limiter), max_workers=max_workers):
+            if is_pro:
+                f.write(url + "\n")
+                f.flush()
+                written += 1
+    logging.info(f"added {written} fighter URLs to {path}")
+    return written
+
+
+if __name__ == "__main__":
+    print('initiating multi-category crawl')
+    count = write_pro_urls()
+    print(f'crawl complete: {count} professional boxers')
@@ -0,0 +1,144 @@
+# import general packages
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+from urllib.parse import unquote
+
+# import the shared pooled HTTP client
+from fetch_client import fetch_client
+
+# import .env journal settings
+from dotenv import load_dotenv
+load_dotenv()
+
+# location of the journal database
+JOURNAL_PATH = os.getenv("CRAWL_JOURNAL_PATH", "crawl_journal.db")
+
+# MediaWiki API, used to look up the current revision of many pages in one request
+API_URL = "https://en.wikipedia.org/w/api.php"
+# maximum number of titles the API accepts per query
+API_BATCH_SIZE = 50
+
+# revision id embedded in the JavaScript config of every rendered Wikipedia page
+REVISION_PATTERN = re.compile(r'"wgRevisionId"\s*:\s*(\d+)')
+
+
+"""
+Crawl-state journal kept in a local SQLite file. One row per URL records the outcome of the last attempt,
+when the page was fetched, a hash of its content and the Wikipedia revision id it was extracted from.
+A re-run resumes after a crash by skipping finished URLs, and a refresh run only re-extracts pages
+whose current revision differs from the one in the journal.
+"""
+class CrawlJournal:
+    def __init__(self, path=JOURNAL_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_state (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                fetched_at REAL,
+                content_hash TEXT,
+                revision_id INTEGER,
+                error TEXT
+            )""")
+        self.conn.commit()
+
+    # journal row for a URL, or None if it has never been attempted
+    def get(self, url):
+        return self.conn.execute("SELECT * FROM crawl_state WHERE url = ?", (url,)).fetchone()
+
+    # record the outcome of a URL. committed straight away so a crash loses at most the page in progress
+    def record(self, url, status, content_hash=None, revision_id=None, error=None):
+        self.conn.execute("""
+            INSERT INTO crawl_state (url, status, fetched_at, content_hash, revision_id, error)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                status = excluded.status,
+                fetched_at = excluded.fetched_at,
+                content_hash = COALESCE(excluded.content_hash, crawl_state.content_hash),
+                revision_id = COALESCE(excluded.revision_id, crawl_state.revision_id),
+                error = excluded.error""",
+            (url, status, time.time(), content_hash, revision_id, error))
+        self.conn.commit()
+
+    # URLs that still need work: never finished, or finished at an older revision than the current one
+    # when the current revision is unknown, a finished URL is left alone
+    def pending(self, url_list, latest_revisions=None):
+        latest_revisions = latest_revisions or {}
+        done = {row['url']: row['revision_id'] for row in
+                self.conn.execute("SELECT url, revision_id FROM crawl_state WHERE status = 'done'")}
+
+        pending = []
+        for url in url_list:
+            if url not in done:
+                pending.append(url)
+            elif latest_revisions.get(url) and latest_revisions[url] != done[url]:
+                pending.append(url)
+        return pending
+
+    def close(self):
+        self.conn.close()
+
+
+# sha256 of a page, to tell whether its content changed
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+# revision id of a rendered Wikipedia page, or None if it is not present
+def page_revision(html):
+    match = REVISION_PATTERN.search(html)
+    return int(match.group(1)) if match else None
+
+
+# page title from a /wiki/ URL, in the form the API reports it
+def url_title(url):
+    return unquote(url.rsplit('/wiki/', 1)[-1]).replace('_', ' ')
+
+
+"""
+Current revision id of every URL, looked up through the MediaWiki API 50 titles at a time.
+A full roster costs a dozen small requests instead of downloading every page. Redirects are followed, so a URL
+for a renamed page gets the revision of the page it now serves. URLs that cannot be resolved are left out of the
+result, and any network error returns what was collected so far.
+"""
+def fetch_latest_revisions(url_list):
+    revisions = {}
+    for i in range(0, len(url_list), API_BATCH_SIZE):
+        batch = url_list[i:i + API_BATCH_SIZE]
+        titles = {url_title(url): url for url in batch}
+        try:
+            response = fetch_client.get(API_URL, timeout=10, params={
+                'action': 'query',
+                'prop': 'revisions',
+                'rvprop': 'ids',
+                'titles': '|'.join(titles),
+                'redirects': 1,
+                'format': 'json',
+                'formatversion': 2,
+            })
+            response.raise_for_status()
+            query = response.json().get('query', {})
+        except Exception as e:
+            logging.error(f"Unable to fetch latest revisions: {e}")
+            break
+
+        # map every returned title back to the titles that were sent for it. the API normalises titles first and
+        # then follows redirects, and several sent titles can end on the same page
+        sent = {title: [title] for title in titles}
+        for step in ('normalized', 'redirects'):
+            for n in query.get(step, []):
+                sent.setdefault(n['to'], []).extend(sent.pop(n['from'], []))
+        for page in query.get('pages', []):
+            if not page.get('revisions'):
+                continue
+            for title in sent.get(page.get('title'), []):
+                revisions[titles[title]] = page['revisions'][0]['revid']
+
+    logging.info(f"Fetched latest revisions for {len(revisions)} of {len(url_list)} URLs")
+    return revisions
@@ -1,59 +1,164 @@
-# import app and db models
-import app
-from app.models import db, Boxer, Fight
+# import the standalone session factory and db models
+from db_session import session_scope
+from app.models import Boxer, DataVersion, RatingWatermark
 
-# import progress bar and logging functionalities
-from tqdm import tqdm
+# import logging functionalities and raw SQL support
 import logging
+from sqlalchemy import text
+
+# import the duplicate folding shared with the unique keys migration
+from app.duplicates import fold_duplicates
+
+# import the trigram name index for names that do not match exactly
+from app.names import NameIndex
 
 """
 During the fist pass of my scraper, the information to complete all of the opponent ID and winner fields was not available,
 as some of the boxer IDs only become available once they are present in the DB. This is a function to resolve the missing
 opponent and winner IDs in the "fights" table. 
+Resolution runs as two set-based UPDATE ... FROM statements against a name -> id index of the boxers table, so the
+database does the matching in one pass and nothing is loaded into the ORM. Names left over are matched against an
+in-memory trigram index of the roster (accents, "(boxer)" suffixes, initials and small spelling differences), loaded
+into a temporary name -> id table, and written back with one UPDATE ... FROM per column. Mirror rows of the same bout
+are merged next. Unresolved names are then streamed out of one anti-join per log file.
+"""
+
+# one id per boxer name. when a name appears more than once the lowest id wins, as .first() did
+NAME_IDS = "(SELECT name, MIN(id) AS id FROM boxers GROUP BY name)"
+
+# fill the column from the boxer whose name matches, for every fight where it is still empty
+RESOLVE_OPPONENTS = f"""
+    UPDATE fights SET boxer_b_id = n.id
+    FROM {NAME_IDS} n
+    WHERE fights.boxer_b_id IS NULL AND fights.opponent_name = n.name
+"""
+RESOLVE_WINNERS = f"""
+    UPDATE fights SET winner_id = n.id
+    FROM {NAME_IDS} n
+    WHERE fights.winner_id IS NULL AND fights.winner_name = n.name
+"""
+
+# distinct names still without an id after the exact pass
+UNMATCHED_NAMES = """
+    SELECT DISTINCT {name_column} FROM fights WHERE {name_column} IS NOT NULL AND {id_column} IS NULL
+"""
+
+# name -> boxer id pairs found by the fuzzy pass, written back by one UPDATE ... FROM per column
+FUZZY_MATCHES_TABLE = "CREATE TEMPORARY TABLE fuzzy_matches (name TEXT PRIMARY KEY, boxer_id INTEGER NOT NULL)"
+ADD_FUZZY_MATCH = "INSERT INTO fuzzy_matches (name, boxer_id) VALUES (:name, :boxer_id)"
+SET_MATCHED_IDS = """
+    UPDATE fights SET {id_column} = m.boxer_id
+    FROM fuzzy_matches m
+    WHERE fights.{id_column} IS NULL AND fights.{name_column} = m.name
+"""
+DROP_FUZZY_MATCHES = "DROP TABLE fuzzy_matches"
+
+# canonical bout key "<lower id>-<higher id>-<date>" for every fight whose two boxer ids are now known
+SET_BOUT_KEYS = """
+    UPDATE fights SET bout_key =
+        CASE WHEN boxer_a_id < boxer_b_id
+             THEN CAST(boxer_a_id AS TEXT) || '-' || CAST(boxer_b_id AS TEXT)
+             ELSE CAST(boxer_b_id AS TEXT) || '-' || CAST(boxer_a_id AS TEXT) END
+        || '-' || CAST(date AS TEXT)
+    WHERE bout_key IS NULL AND boxer_a_id IS NOT NULL AND boxer_b_id IS NOT NULL AND date IS NOT NULL
+"""
+
+# mirror row id -> id of the row kept for the bout (the lowest id)
+DUPLICATE_BOUTS = """
+    SELECT f.id AS dup_id, k.keep_id FROM fights f
+    JOIN (SELECT bout_key, MIN(id) AS keep_id FROM fights WHERE bout_key IS NOT NULL
+          GROUP BY bout_key HAVING COUNT(*) > 1) k
+      ON f.bout_key = k.bout_key AND f.id <> k.keep_id
+"""
+
+# fill gaps in the kept row from its mirror before the mirror is deleted
+MERGE_BOUTS = f"""
+    UPDATE fights SET
+        winner_id = COALESCE(fights.winner_id, m.winner_id),
+        method = COALESCE(fights.method, m.method),
+        rounds_completed = COALESCE(fights.rounds_completed, m.rounds_completed),
+        location = COALESCE(fights.location, m.location),
+        title_fight = COALESCE(fights.title_fight, m.title_fight)
+    FROM (SELECT d.keep_id, f.winner_id, f.method, f.rounds_completed, f.location, f.title_fight
+          FROM ({DUPLICATE_BOUTS}) d JOIN fights f ON f.id = d.dup_id) m
+    WHERE fights.id = m.keep_id
 """
+
+# names that still have no boxer in the DB, one line per fight as before
+UNRESOLVED = """
+    SELECT f.{name_column} FROM fights f
+    WHERE f.{name_column} IS NOT NULL AND f.{id_column} IS NULL
+      AND NOT EXISTS (SELECT 1 FROM boxers b WHERE b.name = f.{name_column})
+    ORDER BY f.id
+"""
+
+
+# match the names left unresolved by the exact pass through the name index, returning how many names matched
+def resolve_fuzzy(session, name_index, name_column, id_column):
+    columns = {'name_column': name_column, 'id_column': id_column}
+    matches = []
+    for name in session.scalars(text(UNMATCHED_NAMES.format(**columns))):
+        boxer_id = name_index.resolve(name)
+        if boxer_id:
+            matches.append({'name': name, 'boxer_id': boxer_id})
+    if matches:
+        session.execute(text(FUZZY_MATCHES_TABLE))
+        session.execute(text(ADD_FUZZY_MATCH), matches)
+        session.execute(text(SET_MATCHED_IDS.format(**columns)))
+        session.execute(text(DROP_FUZZY_MATCHES))
+    return len(matches)
+
+
+"""
+Every bout between two boxers in the DB is scraped from both fighters' pages. Once both ids are known the two rows
+share a bout_key, and this pass merges each set of mirror rows into the lowest id, moving statlines across.
+"""
+def dedupe_bouts(session):
+    session.execute(text(SET_BOUT_KEYS))
+    session.execute(text(MERGE_BOUTS))
+    return fold_duplicates(session, DUPLICATE_BOUTS, 'fights', [('statlines', 'fight_id')])
+
+
+# stream the unresolved names for one column pair into a log file, returning how many were written
+def write_unresolved(session, path, name_column, id_column):
+    query = text(UNRESOLVED.format(name_column=name_column, id_column=id_column))
+    count = 0
+    with open(path, "w", encoding="utf-8") as log:
+        result = session.execute(query, execution_options={'stream_results': True, 'yield_per': 1000})
+        for (name,) in result:
+            log.write(name + "\n")
+            count += 1
+    return count
+
+
 def resolve_fights():
-    with app.app_context():
+    with session_scope() as session:
+        opponents = session.execute(text(RESOLVE_OPPONENTS)).rowcount
+        winners = session.execute(text(RESOLVE_WINNERS)).rowcount
+
+        # the roster is loaded once, and every leftover name costs one in-memory lookup
+        name_index = NameIndex(session.query(Boxer.id, Boxer.name).all())
+        fuzzy_opponents = resolve_fuzzy(session, name_index, "opponent_name", "boxer_b_id")
+        fuzzy_winners = resolve_fuzzy(session, name_index, "winner_name", "winner_id")
+
+        mirrors = dedupe_bouts(session)
+        # fights that gained an opponent or winner can sit below the Elo watermark, where an incremental replay
+        # would never see them, so any resolution makes the next rating run a full replay
+        if opponents or winners or fuzzy_opponents or fuzzy_winners or mirrors:
+            RatingWatermark.reset(session)
+        DataVersion.bump(session)
+        session.commit()
+        logging.info(f"Resolved {opponents} opponents and {winners} winners, {fuzzy_opponents} opponent and "
+                     f"{fuzzy_winners} winner names by fuzzy match, merged {mirrors} mirror bouts")
 
         # keep a log of unresolved winners and opponents
-        opponent_log = open("db_resolver_unresolved_opponents.log", "w", encoding="utf-8")
-        winner_log = open("db_resolver_unresolved_winners.log", "w", encoding="utf-8")
-
-        fights = Fight.query.all()
-
-        # loop through each fight in the table
-        for i, fight in enumerate(tqdm(fights, desc="Resolving fights", unit="fight"), 1):
-
-            # if the opponent name is present, and they are in the DB, enter their ID in the boxer_b_id column
-            if fight.opponent_name and not fight.boxer_b_id:
-                opponent = Boxer.query.filter_by(name=fight.opponent_name).first()
-                if opponent:
-                    fight.boxer_b_id = opponent.id
-                # otherwise, add their name to the unresolved opponent log for future reference
-                else:
-                    opponent_log.write(fight.opponent_name + "\n")
-
-            # if the winner name is present (and it isn't boxer_a), and they are in the DB
-            # enter their ID in the boxer_b_id column
-            if fight.winner_name and not fight.winner_id:
-                winner = Boxer.query.filter_by(name=fight.winner_name).first()
-                if winner:
-                    fight.winner_id = winner.id
-                # otherwise, add their name to the unresolved winner log for future reference
-                else:
-                    winner_log.write(fight.winner_name + "\n")
-
-            # To mitigate progress loss and avoid a heavy final commit, save to db every 500 rows
-            if i % 500 == 0:
-                db.session.commit()
-                logging.info(f"Committed {i} resolved fights...")
-
-
-        db.session.commit()
-        opponent_log.close()
-        winner_log.close()
+        unresolved_opponents = write_unresolved(session, "db_resolver_unresolved_opponents.log", "opponent_name", "boxer_b_id")
+        unresolved_winners = write_unresolved(session, "db_resolver_unresolved_winners.log", "winner_name", "winner_id")
+        logging.info(f"{unresolved_opponents} unresolved opponents and {unresolved_winners} unresolved winners logged")
+
         print("Resolved opponents and winners in fights table\nunresolved items logged to files")
         logging.info("all resolutions committed")
 
 
 if __name__ == "__main__":
-    resolve_fights()
\ No newline at end of file
+    resolve_fights()
@@ -0,0 +1,125 @@
+# import general packages
+import os
+import logging
+import threading
+from contextlib import contextmanager
+
+# import the SQLAlchemy engine and session factory
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+# import the database URL shared with the web app
+from config import DATABASE_URL
+
+# import the data version stamp, bumped with every write so the web app reloads its ratings
+from app.models import DataVersion
+
+# import .env batching setting
+from dotenv import load_dotenv
+load_dotenv()
+
+# boxers loaded per transaction by a batch session
+COMMIT_EVERY = int(os.getenv("SCRAPER_COMMIT_EVERY", "50"))
+
+"""
+Standalone data access for the scraper processes. The models in app.models are ordinary SQLAlchemy mapped classes,
+so the scrapers use them through a plain engine and session factory instead of building the Flask app and entering
+an app context for every boxer. The engine is created on first use, so modules that only parse pages can be
+imported without database settings, and then keeps its connection pool for the rest of the run.
+"""
+Session = sessionmaker()
+_engine = None
+_engine_lock = threading.Lock()
+
+
+# the process-wide engine, created and bound to the session factory on the first call
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+            Session.configure(bind=_engine)
+    return _engine
+
+
+# a new session on the process-wide engine
+def new_session():
+    get_engine()
+    return Session()
+
+
+# one unit of work: commit on success, roll back on error, always close
+@contextmanager
+def session_scope():
+    session = new_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+"""
+One long-lived session for a whole batch. Each loaded boxer is marked with done(), and the transaction is
+committed every commit_every boxers and once more on exit, bumping the data version with each commit.
+Callbacks passed to done() run only after the commit that made the boxer durable, so a crawl journal never
+records a page as finished before its rows are saved.
+Each page is staged inside page(), a savepoint: a database error while loading it discards that page only,
+and the boxers already staged in the open transaction are kept. Any other error rolls back the boxers of the
+open transaction only; earlier commits stay.
+"""
+class BatchSession:
+    def __init__(self, commit_every=COMMIT_EVERY):
+        self.session = new_session()
+        self.commit_every = commit_every
+        self.pending = []
+        self.committed = 0
+        self.failed = False
+
+    # stage one page in a savepoint. if the database rejects it, its rows are discarded and failed is set
+    @contextmanager
+    def page(self, name):
+        savepoint = self.session.begin_nested()
+        try:
+            yield
+        except SQLAlchemyError as e:
+            savepoint.rollback()
+            self.failed = True
+            logging.error(f"Discarded {name} after {type(e).__name__}: {e}")
+        else:
+            savepoint.commit()
+            self.failed = False
+
+    def done(self, callback=None):
+        self.pending.append(callback)
+        if len(self.pending) >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        if self.pending:
+            DataVersion.bump(self.session)
+        self.session.commit()
+        for callback in self.pending:
+            if callback:
+                callback()
+        self.committed += len(self.pending)
+        logging.info(f"Committed {self.committed} boxers")
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.session.rollback()
+                logging.error(f"Rolled back {len(self.pending)} uncommitted boxers after {exc_type.__name__}")
+        finally:
+            self.session.close()
+        return False
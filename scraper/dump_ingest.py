@@ -0,0 +1,436 @@
+# import general packages
+import re
+import bz2
+import sys
+import html
+import hashlib
+import logging
+import xml.etree.ElementTree as ET
+
+# import progress bar utility
+from tqdm import tqdm
+
+# import date parsing and batch loading from the main scraper
+from scraper import parse_date, DEFAULT_BOXER_IMAGE
+
+# import the pro-record rule used by the link scraper to keep amateurs out
+from heavyweight_link_scraper import FIGHT_TABLE_HEADERS
+
+# import the batch loader selection (ORM or COPY)
+from copy_ingest import batch_loader
+
+# number of boxers loaded into the DB per commit
+BATCH_SIZE = 50
+
+# category that marks a page as a heavyweight boxer
+CATEGORY_PATTERN = re.compile(r'\[\[\s*Category\s*:\s*Heavyweight[ _]boxers\s*(?:\|[^\]]*)?\]\]', re.IGNORECASE)
+
+"""
+Offline ingestion from a local Wikipedia XML dump (pages-articles*.xml.bz2).
+The dump is decompressed and parsed as a stream with iterparse, and every <page> element is cleared as soon as it
+has been read, so memory use stays flat however large the dump is. Pages in Category:Heavyweight_boxers have their
+wikitext infobox, BoxingRecordSummary and record table turned into the same data / fight_matrix structures that
+parse_data produces, and are fed to the existing insert path in batches. Pages without a professional record table
+are skipped, as the link scraper skips them when building urls.txt.
+Usage: python dump_ingest.py enwiki-latest-pages-articles.xml.bz2
+Set INGEST_LOADER=copy to load through PostgreSQL COPY (copy_ingest.py) instead of the ORM.
+"""
+
+
+# strip the XML namespace from a tag name
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+# stream (title, wikitext) for every article in the dump, without ever holding more than one page in memory
+def iter_dump_pages(path):
+    opener = bz2.open if path.endswith('.bz2') else open
+    with opener(path, 'rb') as f:
+        context = ET.iterparse(f, events=('start', 'end'))
+        _, root = next(context)
+
+        for event, elem in context:
+            if event != 'end' or local_name(elem.tag) != 'page':
+                continue
+
+            title = ns = text = None
+            redirect = False
+            for child in elem.iter():
+                name = local_name(child.tag)
+                if name == 'title':
+                    title = child.text
+                elif name == 'ns':
+                    ns = child.text
+                elif name == 'redirect':
+                    redirect = True
+                elif name == 'text':
+                    text = child.text
+
+            # release the page, and everything already read, before moving on
+            elem.clear()
+            root.clear()
+
+            # articles only, no redirects
+            if ns == '0' and not redirect and title and text:
+                yield title, text
+
+
+"""
+Wikitext helpers. Templates are located by counting braces, and split into parameters on the pipes that are not
+inside a nested template or link.
+"""
+# return the body of the first {{name ...}} template in the text, or None
+def find_template(text, name):
+    match = re.search(r'\{\{\s*' + re.escape(name) + r'\s*[|}\n]', text, re.IGNORECASE)
+    if not match:
+        return None
+
+    start = match.start()
+    depth = 0
+    i = start
+    while i < len(text) - 1:
+        pair = text[i:i + 2]
+        if pair == '{{':
+            depth += 1
+            i += 2
+        elif pair == '}}':
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return text[start + 2:i - 2]
+        else:
+            i += 1
+    return None
+
+
+# split text on the pipes that are not inside a nested template or link
+def split_top_level(text):
+    parts = []
+    depth = 0
+    current = ''
+    i = 0
+    while i < len(text):
+        pair = text[i:i + 2]
+        if pair in ('{{', '[['):
+            depth += 1
+            current += pair
+            i += 2
+        elif pair in ('}}', ']]'):
+            depth -= 1
+            current += pair
+            i += 2
+        elif text[i] == '|' and depth == 0:
+            parts.append(current)
+            current = ''
+            i += 1
+        else:
+            current += text[i]
+            i += 1
+    parts.append(current)
+    return parts
+
+
+# split a template body into its name, positional parameters and named parameters
+def split_params(body):
+    parts = split_top_level(body)
+
+    positional = []
+    named = {}
+    for part in parts[1:]:
+        key, sep, value = part.partition('=')
+        if sep and re.fullmatch(r'\s*[\w\- ]+\s*', key):
+            named[key.strip().lower()] = value.strip()
+        else:
+            positional.append(part.strip())
+    return parts[0].strip(), positional, named
+
+
+# iso date from the year, month and day parameters of a date template
+# dates written with month names are left as text for parse_date to read
+def template_date(positional):
+    numbers = [p for p in positional if p.isdigit()]
+    if len(numbers) >= 3:
+        return f"{int(numbers[0]):04d}-{int(numbers[1]):02d}-{int(numbers[2]):02d}"
+    return ' '.join(positional[:3])
+
+
+# render the text a template would display, for the templates that appear in boxer infoboxes and record tables
+def render_template(body):
+    name, positional, named = split_params(body)
+    name = name.lower()
+
+    if name in ('dts', 'start date', 'end date', 'birth date', 'birth date and age', 'death date', 'death date and age'):
+        return template_date(positional)
+    if name in ('abbr', 'nowrap', 'small', 'nobold', 'sup') and positional:
+        return positional[0]
+    if name == 'sortname':
+        return ' '.join(positional[:2])
+    if name in ('sort', 'lang') and len(positional) > 1:
+        return positional[1]
+    if name in ('ubl', 'unbulleted list', 'plainlist', 'hlist', 'flatlist'):
+        return ' '.join(positional)
+    if name == 'convert' and len(positional) >= 2:
+        return f"{positional[0]} {positional[1]}"
+    # flags, colour markers (yes2, no2, draw...) and anything else render as nothing
+    return ''
+
+
+# convert a fragment of wikitext to the plain text a reader would see
+def strip_markup(text):
+    if not text:
+        return ''
+    text = re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
+    text = re.sub(r'<ref[^>/]*/>', '', text)
+    text = re.sub(r'<ref[^>]*>.*?</ref>', '', text, flags=re.DOTALL)
+    text = re.sub(r'<[^>]+>', '', text)
+
+    # innermost templates first, until none are left
+    template = re.compile(r'\{\{([^{}]*)\}\}')
+    while template.search(text):
+        text = template.sub(lambda m: render_template(m.group(1)), text)
+
+    text = re.sub(r'\[\[(?:[^|\]]*\|)?([^\]]*)\]\]', r'\1', text)
+    text = re.sub(r'\[https?://\S+\s+([^\]]*)\]', r'\1', text)
+    text = text.replace("'''", '').replace("''", '')
+    text = html.unescape(text).replace('\xa0', ' ')
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+# convert a height or reach value to cm: metric values, convert templates, height templates and feet/inches
+def length_to_cm(value):
+    if not value:
+        return None
+
+    height = find_template(value, 'height')
+    if height:
+        _, _, named = split_params(height)
+        if named.get('m'):
+            return round(float(named['m']) * 100)
+        if named.get('cm'):
+            return round(float(named['cm']))
+        feet = float(named.get('ft') or 0)
+        inches = float(named.get('in') or 0)
+        if feet or inches:
+            return round((feet * 12 + inches) * 2.54)
+
+    convert = find_template(value, 'convert')
+    if convert:
+        _, positional, _ = split_params(convert)
+        if len(positional) >= 2:
+            try:
+                amount = float(positional[0])
+            except ValueError:
+                amount = None
+            if amount is not None:
+                factors = {'cm': 1, 'm': 100, 'in': 2.54, 'ft': 30.48}
+                if positional[1] in factors:
+                    return round(amount * factors[positional[1]])
+
+    # same rules as the HTML extraction: cm first, then metres
+    plain = strip_markup(value)
+    cm_match = re.search(r'(\d+)\s*cm', plain)
+    if cm_match:
+        return int(cm_match.group(1))
+    m_match = re.search(r'(\d+(?:\.\d+)?)\s*m\b', plain)
+    if m_match:
+        return round(float(m_match.group(1)) * 100)
+    return None
+
+
+# full Wikimedia Commons URL for an infobox image file name
+def image_url(file_name):
+    file_name = strip_markup(file_name)
+    file_name = re.sub(r'^(File|Image):', '', file_name, flags=re.IGNORECASE).strip().replace(' ', '_')
+    if not file_name:
+        return DEFAULT_BOXER_IMAGE
+    digest = hashlib.md5(file_name.encode('utf-8')).hexdigest()
+    return f"https://upload.wikimedia.org/wikipedia/commons/{digest[0]}/{digest[:2]}/{file_name}"
+
+
+# extract the boxers table fields from the infobox
+def extract_infobox(title, text):
+    data = {'name': title.replace(" (boxer)", "").strip()}
+
+    body = find_template(text, 'Infobox boxer')
+    if not body:
+        return None
+    _, _, fields = split_params(body)
+
+    data['photo'] = image_url(fields['image']) if fields.get('image') else DEFAULT_BOXER_IMAGE
+
+    # the HTML extraction takes the first list item of the nickname, without quotation marks
+    nickname = fields.get('nickname')
+    if nickname:
+        lists = find_template(nickname, 'ubl') or find_template(nickname, 'plainlist') or find_template(nickname, 'unbulleted list')
+        if lists:
+            _, items, _ = split_params(lists)
+            nickname = items[0] if items else nickname
+        nickname = re.split(r'<br\s*/?>|\n\*', nickname.lstrip('* '))[0]
+        alias = strip_markup(nickname).replace('"', '').replace("'", '').strip()
+        if alias:
+            data['alias'] = alias
+
+    stance = re.search(r'\b(Orthodox|Southpaw|Switch)\b', strip_markup(fields.get('stance', '')), re.IGNORECASE)
+    if stance:
+        data['stance'] = stance.group(1).capitalize()
+
+    birth_date = strip_markup(fields.get('birth_date', ''))
+    if re.fullmatch(r'\d{4}-\d{2}-\d{2}', birth_date):
+        data['birth_date'] = birth_date
+
+    height_cm = length_to_cm(fields.get('height'))
+    if height_cm:
+        data['height_cm'] = height_cm
+    reach_cm = length_to_cm(fields.get('reach'))
+    if reach_cm:
+        data['reach_cm'] = reach_cm
+
+    return data
+
+
+# turn a wikitable row into its cells. cells can share a line (|| or !!) and carry attributes before a single pipe
+def row_cells(lines):
+    cells = []
+    for line in lines:
+        separator = '!!' if line[0] == '!' else '||'
+        for cell in line[1:].split(separator):
+            # drop cell attributes such as align=left| or style="..."|
+            parts = split_top_level(cell)
+            if len(parts) > 1 and '=' in parts[0]:
+                cell = '|'.join(parts[1:])
+            cells.append(strip_markup(cell))
+    return cells
+
+
+# find the professional record table and build the fight matrix, with the same keys as the HTML extraction
+# returns None when the page has no professional record table, the same test the link scraper applies to HTML
+def extract_fight_matrix(text):
+    for table in re.findall(r'\{\|[^\n]*wikitable.*?\n\|\}', text, re.DOTALL):
+        headers = []
+        fight_matrix = []
+
+        for row in re.split(r'\n\|-[^\n]*', table):
+            lines = []
+            for line in row.split('\n'):
+                if line.startswith(('{|', '|}', '|+')):
+                    continue
+                if line.startswith(('|', '!')):
+                    lines.append(line)
+                elif lines and line.strip():
+                    # continuation of a multi-line cell
+                    lines[-1] += ' ' + line
+
+            if not lines:
+                continue
+
+            # the first row of header cells names the columns
+            if not headers and lines[0].startswith('!'):
+                headers = row_cells(lines)
+                continue
+
+            cells = row_cells(lines)
+            if headers and len(cells) == len(headers):
+                fight_matrix.append(dict(zip(headers, cells)))
+
+        if FIGHT_TABLE_HEADERS <= set(headers):
+            return fight_matrix
+    return None
+
+
+# fill the ranking_metrics fields from the BoxingRecordSummary template
+def extract_record(text, data):
+    body = find_template(text, 'BoxingRecordSummary')
+    fields = split_params(body)[2] if body else {}
+
+    def number(key):
+        value = strip_markup(fields.get(key, ''))
+        return int(value) if value.isdigit() else 0
+
+    number_of_fights = number('total-fights')
+    number_of_wins = number('total-wins')
+    wins_by_ko = number('wins-ko')
+
+    data['num_of_fights'] = number_of_fights
+    data['wins'] = number_of_wins
+    data['losses'] = number('total-losses')
+    data['wins_by_ko'] = wins_by_ko
+    data['wins_by_decision'] = number('wins-dec')
+    data['wins_by_dq'] = number('wins-dq')
+    data['losses_by_ko'] = number('losses-ko')
+    data['losses_by_decision'] = number('losses-dec')
+    data['losses_by_dq'] = number('losses-dq')
+
+    # same ratio rules as the HTML extraction
+    if number_of_fights > 0 and number_of_wins > 0:
+        data['win_ratio'] = round((number_of_wins / number_of_fights), 2)
+        data['ko_ratio'] = round((wins_by_ko / number_of_wins), 2)
+    else:
+        data['win_ratio'] = 0.0
+        data['ko_ratio'] = 0.0
+
+
+# active dates and eras from the fight dates, as in the HTML extraction
+def extract_active_dates(fight_matrix, data):
+    dates = [dt for dt in (parse_date(fight.get('Date')) for fight in fight_matrix if fight.get('Date')) if dt]
+    if not dates:
+        data['era'] = None
+        return
+
+    data['active_from'] = min(dates).strftime('%Y-%m-%d')
+    data['active_until'] = max(dates).strftime('%Y-%m-%d')
+
+    start = (min(dates).year // 10) * 10
+    end = (max(dates).year // 10) * 10
+    data['era'] = [str(decade)[-2:] + "s" for decade in range(start, end + 1, 10)]
+
+
+# build the data dictionary and fight matrix for one boxer page
+def parse_wikitext(title, text):
+    data = extract_infobox(title, text)
+    if not data:
+        logging.warning(f"Infobox not found for {title}. Skipping boxer.")
+        return None, None
+
+    # amateurs are left out, as the link scraper leaves them out of urls.txt
+    fight_matrix = extract_fight_matrix(text)
+    if fight_matrix is None:
+        logging.info(f"No professional record table for {title}. Skipping boxer.")
+        return None, None
+
+    extract_active_dates(fight_matrix, data)
+    extract_record(text, data)
+    return data, fight_matrix
+
+
+def ingest_dump(path, batch_size=BATCH_SIZE, update=False, loader=None):
+    load, batch_size = batch_loader(loader, batch_size)
+    batch = []
+    boxers = 0
+
+    for title, text in tqdm(iter_dump_pages(path), desc="Scanning dump", unit="page"):
+        # cheap substring test before the category regex
+        if 'eavyweight' not in text or not CATEGORY_PATTERN.search(text):
+            continue
+
+        data, fight_matrix = parse_wikitext(title, text)
+        if not data:
+            continue
+
+        batch.append((data, fight_matrix))
+        boxers += 1
+        if len(batch) >= batch_size:
+            load(batch, update=update)
+            batch = []
+
+    if batch:
+        load(batch, update=update)
+
+    logging.info(f"Ingested {boxers} heavyweight boxers from {path}")
+    print(f"ingested {boxers} heavyweight boxers")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("usage: python dump_ingest.py <pages-articles.xml.bz2>")
+        sys.exit(1)
+    ingest_dump(sys.argv[1])
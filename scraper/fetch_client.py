@@ -0,0 +1,145 @@
+# import general packages
+import time
+import random
+import logging
+import threading
+import requests
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# import the worker count so the connection pool matches the number of concurrent fetches,
+# and the per-host rate limiter applied to every request sent over the network
+from fetch_engine import HostRateLimiter, MAX_WORKERS, REQUESTS_PER_SECOND, BURST
+
+# identify the scraper to Wikipedia, as its API etiquette asks
+USER_AGENT = "BoxingLegacyAnalyser/1.0 (https://github.com/mjthejumpman/Boxing_Legacy_Analyser)"
+
+# responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# number of retries after the first attempt
+MAX_RETRIES = 4
+# exponential backoff: the nth retry waits a random time up to BACKOFF_BASE * 2^n seconds, capped at BACKOFF_CAP
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+# longest Retry-After waited out in full. a server asking for more gets the URL given up on instead
+RETRY_AFTER_MAX = 600.0
+
+
+"""
+Shared HTTP client for both scrapers, built on one pooled requests.Session.
+Connections are kept alive and reused across pages instead of opening a new TCP/TLS connection per request,
+and responses are negotiated as gzip or brotli (urllib3 only advertises br when Brotli is installed).
+Every request sent, retries included, first takes a token from a per-host rate limiter, so pages served from the
+page cache never use up the rate limit. A run with its own rate passes its limiter to get(), and every other request
+shares the client's default limiter, so one run never changes the rate another one fetches at.
+429 and 5xx responses and connection errors are retried, honouring Retry-After and otherwise
+backing off exponentially with full jitter, so one transient error no longer loses a boxer for the whole batch.
+Retry-After is waited out in full, never shortened; above RETRY_AFTER_MAX the response is returned as it is.
+"""
+class FetchClient:
+    def __init__(self, pool_size=MAX_WORKERS, max_retries=MAX_RETRIES, limiter=None):
+        self.max_retries = max_retries
+        self.limiter = limiter or HostRateLimiter(rate=REQUESTS_PER_SECOND, burst=BURST)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    # full-jitter exponential backoff for the given retry attempt
+    @staticmethod
+    def backoff(attempt):
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    # seconds requested by a Retry-After header, in either of its two formats, or None
+    @staticmethod
+    def retry_after(response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    # GET with retries, taking tokens from the given limiter or the client's default one.
+    # returns the final response, or raises the last connection error
+    def get(self, url, timeout=10, limiter=None, **kwargs):
+        limiter = self.limiter if limiter is None else limiter
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire(url)
+            self.count('requests')
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    self.count('failures')
+                    raise
+                delay = self.backoff(attempt)
+                logging.warning(f"{e} fetching {url}. Retrying in {delay:.1f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    if response.status_code in RETRY_STATUSES:
+                        self.count('failures')
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                elif delay > RETRY_AFTER_MAX:
+                    self.count('failures')
+                    logging.error(f"HTTP {response.status_code} fetching {url} with Retry-After of {delay:.0f}s. "
+                                  f"Giving up on the URL")
+                    return response
+                logging.warning(f"HTTP {response.status_code} fetching {url}. Retrying in {delay:.1f}s")
+
+            self.count('retries')
+            time.sleep(delay)
+
+    # connections opened and requests sent, read from the urllib3 pools behind the session
+    def connection_stats(self):
+        connections = 0
+        pool_requests = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                connections += pool.num_connections
+                pool_requests += pool.num_requests
+        return connections, pool_requests
+
+    # one line summary of the run for the log file
+    def summary(self):
+        connections, pool_requests = self.connection_stats()
+        return (f"fetch client: {self.stats['requests']} requests, {self.stats['retries']} retries, "
+                f"{self.stats['failures']} failures, {connections} connections opened, "
+                f"{max(0, pool_requests - connections)} connection reuses")
+
+
+# bytes of a response body as received over the wire, i.e. before gzip or brotli decoding. urllib3 counts them
+# while requests reads the body, so the body is read first. Content-Length, also the encoded size, is the fallback
+def bytes_received(response):
+    body = response.content
+    try:
+        received = response.raw.tell()
+        if received:
+            return received
+    except AttributeError:
+        pass
+    length = response.headers.get('Content-Length', '')
+    return int(length) if length.isdigit() else len(body)
+
+
+# shared client instance used by the page cache and the crawl journal
+fetch_client = FetchClient()
@@ -0,0 +1,96 @@
+# import general packages
+import time
+import threading
+import logging
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# default politeness settings for concurrent crawling
+# number of pages allowed in flight at the same time
+MAX_WORKERS = 8
+# sustained number of requests per second allowed against a single host
+REQUESTS_PER_SECOND = 4
+# number of requests that may be sent back to back before the rate limit applies
+BURST = 4
+
+
+"""
+Token bucket rate limiter. Tokens refill continuously at `rate` per second up to `capacity`.
+Each request takes a token, and a request that finds the bucket empty reserves the next token
+and sleeps until it is due, so waiting callers are served in the order they arrived.
+"""
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # take a token, blocking for as long as needed to respect the rate
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        # sleep outside the lock so other hosts and callers are not held up
+        if delay > 0:
+            time.sleep(delay)
+
+
+# one token bucket per host, created on first use and shared between all worker threads
+class HostRateLimiter:
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self.buckets[host] = bucket
+        bucket.acquire()
+
+
+"""
+Fetch a list of URLs with a bounded pool of worker threads, and yield (url, result) pairs as soon as
+each page arrives, so the caller can parse and insert while the remaining pages are still downloading.
+Only a limited number of requests are queued at once, which keeps memory flat on long URL lists.
+Results are yielded in completion order, not input order.
+The per-host rate limit is applied by the fetch client when a request actually goes over the network,
+so pages the fetch function serves from the page cache are not held back by it.
+"""
+def fetch_concurrently(urls, fetch, max_workers=MAX_WORKERS):
+    url_iter = iter(urls)
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # keep the queue topped up to twice the worker count
+        def submit_next():
+            for url in url_iter:
+                in_flight[executor.submit(fetch, url)] = url
+                return True
+            return False
+
+        for _ in range(max_workers * 2):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Error fetching {url}: {e}")
+                    result = None
+                submit_next()
+                yield url, result
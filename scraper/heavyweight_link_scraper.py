@@ -1,10 +1,18 @@
 # import general packages
-import requests
 import time
 import logging
 
-# import HTML parser
+# import HTML parsers. the stdlib streaming parser is used for the early-exit fight table check
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+
+# import concurrent fetching and the per-host rate limiter, which the fetch client applies to each request it sends
+from functools import partial
+from fetch_engine import fetch_concurrently, HostRateLimiter, MAX_WORKERS, REQUESTS_PER_SECOND
+
+# import the on-disk page cache shared with scraper.py, and the pooled HTTP client behind it
+from page_cache import page_cache
+from fetch_client import fetch_client
 
 # setup logging function to check for errors whilst scraping
 logging.basicConfig(
@@ -17,14 +25,17 @@ logging.basicConfig(
 BASE_URL = "https://en.wikipedia.org"
 CATEGORY_URL = "https://en.wikipedia.org/wiki/Category:Heavyweight_boxers"
 
+# headers that together mark a wikitable as a professional fight record. pages without one are amateurs only
+FIGHT_TABLE_HEADERS = {"Result", "Opponent", "Date"}
+
 
-# return a soup object from any requested URL
-def make_soup(url):
+# return a soup object from any requested URL, fetched through the shared page cache
+# limiter is the rate limiter of the run, or None for the fetch client's default
+def make_soup(url, limiter=None):
     try:
         logging.info(f"fetching URL: {url}")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "html.parser")
+        html = page_cache.fetch(url, timeout=10, limiter=limiter)
+        return BeautifulSoup(html, "html.parser")
     except Exception as e:
         logging.error(f"Error fetching {url}: {e}")
         return None
@@ -37,7 +48,8 @@ def parse_links(url):
         logging.error(f"Unable to make soup from {url}. Aborting operation")
         return []
 
-    boxer_urls = []
+    # dict used as an insertion-ordered set: O(1) duplicate checks, original link order kept
+    boxer_urls = {}
 
     # extract the fighter links from the category block
     while True:
@@ -56,57 +68,135 @@ def parse_links(url):
 
             # reform complete page URL and store
             full_url = BASE_URL + href
-            if full_url not in boxer_urls:
-                boxer_urls.append(full_url)
+            boxer_urls.setdefault(full_url)
 
         # extract the next page link and store it as the soup variable
         next_page = soup.find("a", string="next page")
         if next_page and 'href' in next_page.attrs:
             next_url = BASE_URL + next_page["href"]
             soup = make_soup(next_url)
-            # crawl delay to avoid denied access
-            time.sleep(1)
+            # crawl delay to avoid denied access. not needed when replaying from the page cache
+            if page_cache.mode != 'offline':
+                time.sleep(1)
         else:
             break
 
     logging.info(f"{len(boxer_urls)} URLs extracted")
-    return boxer_urls
+    return list(boxer_urls)
+
+
+# raised to abandon parsing once the answer is known
+class StopParsing(Exception):
+    pass
+
+
+"""
+Streaming detector for the professional record table. Collects the <th> text of every open wikitable and
+stops parsing the moment a table has Result, Opponent and Date headers, so the rest of the page is never read.
+"""
+class FightTableDetector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        # one entry per open <table>: the set of header texts, or None for tables that are not wikitables
+        self.tables = []
+        self.th_text = None
+        self.found = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            classes = (dict(attrs).get('class') or '').split()
+            self.tables.append(set() if 'wikitable' in classes else None)
+        elif tag == 'th' and self.tables:
+            self.th_text = []
+
+    def handle_data(self, data):
+        if self.th_text is not None:
+            self.th_text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'th' and self.th_text is not None:
+            # same text as get_text(strip=True)
+            header = ''.join(text.strip() for text in self.th_text)
+            self.th_text = None
+            # a header also belongs to every wikitable it is nested in, as with find_all('th')
+            for headers in self.tables:
+                if headers is None:
+                    continue
+                headers.add(header)
+                if FIGHT_TABLE_HEADERS <= headers:
+                    self.found = True
+                    raise StopParsing
+        elif tag == 'table' and self.tables:
+            self.tables.pop()
+
+
+# check page HTML for a professional fight table, feeding it to the detector in chunks and stopping early
+def html_contains_fight_table(html, chunk_size=65536):
+    detector = FightTableDetector()
+    try:
+        for i in range(0, len(html), chunk_size):
+            detector.feed(html[i:i + chunk_size])
+    except StopParsing:
+        pass
+    return detector.found
 
 
 # check whether the page contains a professional fight table
-def contains_fight_table(url):
-    soup = make_soup(url)
-    if not soup:
-        logging.error(f"Unable to make soup from {url}. Aborting operation")
+def contains_fight_table(url, limiter=None):
+    try:
+        html = page_cache.fetch(url, timeout=10, limiter=limiter)
+    except Exception as e:
+        logging.error(f"Error fetching {url}: {e}. Aborting operation")
         return False
 
     # search for specific columns that comprise the pro boxing record header
     # if present, then the fighter is a professional heavyweight and not solely an amateur
     try:
-        for table in soup.find_all("table", class_="wikitable"):
-            headers = [th.get_text(strip=True) for th in table.find_all("th")]
-            if "Result" in headers and "Opponent" in headers and "Date" in headers:
-                return True
+        return html_contains_fight_table(html)
     except Exception as e:
         logging.warning(f"unable to parse record table in {url}. {e}")
 
     return False
 
+
+"""
+Classify boxer pages concurrently with a bounded pool of workers sharing one per-host rate limiter for this run.
+Every page goes through the page cache, so the main scraper picks the same pages up from disk afterwards
+instead of downloading them again. Returns the professional boxer URLs in their original order.
+"""
+def classify_concurrently(url_list, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND):
+    limiter = HostRateLimiter(rate=requests_per_second, burst=max_workers)
+
+    pro = set()
+    for url, is_pro in fetch_concurrently(url_list, partial(contains_fight_table, limiter=limiter),
+                                          max_workers=max_workers):
+        if is_pro:
+            pro.add(url)
+            logging.info(f"pro boxer added: {url}")
+
+    return [url for url in url_list if url in pro]
+
+
 # execution of scrape and writing of links to urls.txt
-def main():
+# concurrent=False restores the one-page-at-a-time crawl with a fixed delay
+def main(concurrent=True):
     print('initiating scrape')
 
     # gather all links from the heavyweight category pages
     url_list = parse_links(CATEGORY_URL)
-    pro_urls = []
 
     # ensure that all URLs are those of professional boxers
-    for url in url_list:
-        if contains_fight_table(url):
-            pro_urls.append(url)
-            logging.info(f"pro boxer added: {url}")
-        # crawl delay to avoid denied access
-        time.sleep(1)
+    if concurrent:
+        pro_urls = classify_concurrently(url_list)
+    else:
+        pro_urls = []
+        for url in url_list:
+            if contains_fight_table(url):
+                pro_urls.append(url)
+                logging.info(f"pro boxer added: {url}")
+            # crawl delay to avoid denied access. not needed when replaying from the page cache
+            if page_cache.mode != 'offline':
+                time.sleep(1)
 
     # write URLs to urls.txt
     # encode in UTF-8 to handle non-ASCII characters in the fighter names
@@ -118,6 +208,9 @@ def main():
     except Exception as e:
         logging.error(f"unable to write URLs to urls.txt: {e}")
 
+    logging.info(page_cache.summary())
+    logging.info(fetch_client.summary())
+
     print('scraping complete')
 
 if __name__ == "__main__":
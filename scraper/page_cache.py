@@ -0,0 +1,183 @@
+# import general packages
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+# import the shared pooled HTTP client, and its count of the bytes actually received
+from fetch_client import fetch_client, bytes_received
+
+# import .env cache settings
+from dotenv import load_dotenv
+load_dotenv()
+
+# cache location and behaviour, overridable from the .env file
+# modes:
+#   revalidate - serve stored pages after a conditional GET confirms they are unchanged (default)
+#   offline    - serve stored pages only, never touch the network. missing pages raise CacheMiss
+#   off        - bypass the cache entirely
+CACHE_DIR = os.getenv("PAGE_CACHE_DIR", "page_cache")
+CACHE_MODE = os.getenv("PAGE_CACHE_MODE", "revalidate")
+# seconds a page may be served without revalidating, so pages fetched by the link scraper are handed
+# straight to the main scraper when it runs shortly afterwards
+CACHE_MAX_AGE = int(os.getenv("PAGE_CACHE_MAX_AGE", "3600"))
+
+
+# raised in offline mode when a page has never been stored
+class CacheMiss(Exception):
+    pass
+
+
+"""
+Content-addressed on-disk page cache shared by the scrapers.
+Page bodies are stored once under objects/ keyed by the sha256 of their content, so identical pages share a file.
+A small JSON entry per URL under index/ points at the body and keeps the ETag and Last-Modified headers
+needed to revalidate the page with a conditional GET on the next run.
+"""
+class PageCache:
+    def __init__(self, directory=CACHE_DIR, mode=CACHE_MODE, max_age=CACHE_MAX_AGE):
+        self.directory = directory
+        self.mode = mode
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        # bytes_downloaded counts what came over the wire, bytes_decoded the page bodies after decompression
+        self.stats = {'hits': 0, 'fresh': 0, 'revalidated': 0, 'downloaded': 0, 'bytes_downloaded': 0,
+                      'bytes_decoded': 0}
+
+    # path of the index entry for a URL
+    def entry_path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, 'index', key[:2], key + '.json')
+
+    # path of a stored page body
+    def object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest + '.html')
+
+    # return the index entry for a URL, or None if the page has not been stored
+    def lookup(self, url):
+        try:
+            with open(self.entry_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # an entry without its body is treated as a miss
+        if not os.path.exists(self.object_path(entry['sha256'])):
+            return None
+        return entry
+
+    # path of the stored body for a URL, or None if the page has not been stored
+    def path_for(self, url):
+        entry = self.lookup(url)
+        return self.object_path(entry['sha256']) if entry else None
+
+    # read a stored page body
+    def read(self, entry):
+        with open(self.object_path(entry['sha256']), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    # write a file atomically so a crash or a concurrent reader never sees a partial file
+    def write_atomic(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    # store a page body and its validators, returning the new index entry
+    def store(self, url, text, etag=None, last_modified=None):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        body_path = self.object_path(digest)
+        if not os.path.exists(body_path):
+            self.write_atomic(body_path, text)
+
+        now = time.time()
+        entry = {
+            'url': url,
+            'sha256': digest,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'checked_at': now,
+        }
+        self.write_atomic(self.entry_path(url), json.dumps(entry))
+        return entry
+
+    def count(self, stat, amount=1):
+        with self.lock:
+            self.stats[stat] += amount
+
+    """
+    Return the HTML of a page, downloading it only when the stored copy is missing or out of date.
+    Stored pages are revalidated with If-None-Match / If-Modified-Since, and a 304 response serves the stored body.
+    Pages checked less than max_age seconds ago are served without any request.
+    Requests take tokens from the given rate limiter, or the fetch client's default one.
+    Raises CacheMiss in offline mode, and the usual requests exceptions once the fetch client has run out of retries.
+    """
+    def fetch(self, url, timeout=10, max_age=None, limiter=None):
+        if self.mode == 'off':
+            response = fetch_client.get(url, timeout=timeout, limiter=limiter)
+            response.raise_for_status()
+            return response.text
+
+        entry = self.lookup(url)
+
+        if self.mode == 'offline':
+            if not entry:
+                raise CacheMiss(f"{url} not in page cache")
+            self.count('hits')
+            return self.read(entry)
+
+        # recently checked pages are served without a request
+        max_age = self.max_age if max_age is None else max_age
+        if entry and time.time() - entry.get('checked_at', 0) < max_age:
+            self.count('fresh')
+            return self.read(entry)
+
+        # conditional GET using the validators from the previous download
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = fetch_client.get(url, headers=headers, timeout=timeout, limiter=limiter)
+
+        if response.status_code == 304 and entry:
+            entry['checked_at'] = time.time()
+            self.write_atomic(self.entry_path(url), json.dumps(entry))
+            self.count('revalidated')
+            return self.read(entry)
+
+        response.raise_for_status()
+        self.count('downloaded')
+        self.count('bytes_downloaded', bytes_received(response))
+        self.count('bytes_decoded', len(response.content))
+        self.store(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.text
+
+    # one line summary of the cache activity for the log file
+    def summary(self):
+        transferred, decoded = self.stats['bytes_downloaded'], self.stats['bytes_decoded']
+        saved = 100 * (1 - transferred / decoded) if decoded else 0.0
+        return (f"page cache: {self.stats['hits']} offline hits, {self.stats['fresh']} fresh hits, "
+                f"{self.stats['revalidated']} revalidated (304), "
+                f"{self.stats['downloaded']} downloaded, {transferred} bytes transferred for {decoded} bytes of pages "
+                f"({saved:.0f}% saved by compression)")
+
+
+# collect every saved .html page below a directory, in a stable order
+def find_saved_pages(directory):
+    pages = []
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.endswith('.html'):
+                pages.append(os.path.join(root, file))
+    return sorted(pages)
+
+
+# shared cache instance used by both scraper modules
+page_cache = PageCache()
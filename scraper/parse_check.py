@@ -0,0 +1,51 @@
+# import general packages
+import os
+import sys
+import time
+
+# import the document builder and extraction from the main scraper
+from scraper import make_document, extract_data
+
+# import the page cache location, where saved pages are kept by default
+from page_cache import CACHE_DIR, find_saved_pages
+
+"""
+Check that partial parsing (lxml + SoupStrainer) gives exactly the same data and fight_matrix as a full
+html.parser parse, over a directory of saved pages. Reports every page that differs and the parse speed-up.
+Usage: python parse_check.py [directory]  (defaults to the page cache)
+"""
+
+
+def compare_parse_modes(directory=os.path.join(CACHE_DIR, 'objects')):
+    pages = find_saved_pages(directory)
+    if not pages:
+        print(f"no saved pages found in {directory}")
+        return False
+
+    mismatches = 0
+    timings = {'full': 0.0, 'partial': 0.0}
+
+    for path in pages:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        results = {}
+        for mode in ('full', 'partial'):
+            start = time.perf_counter()
+            soup = make_document(html, mode)
+            timings[mode] += time.perf_counter() - start
+            results[mode] = extract_data(soup)
+
+        if results['full'] != results['partial']:
+            mismatches += 1
+            print(f"MISMATCH: {path}")
+
+    print(f"{len(pages)} pages checked, {mismatches} mismatches")
+    print(f"full parse: {timings['full']:.2f}s, partial parse: {timings['partial']:.2f}s "
+          f"({timings['full'] / max(timings['partial'], 1e-9):.1f}x faster)")
+    return mismatches == 0
+
+
+if __name__ == '__main__':
+    ok = compare_parse_modes(*sys.argv[1:2])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,73 @@
+# import the standalone session factory
+from db_session import new_session
+
+# import raw SQL support
+from sqlalchemy import text
+
+"""
+Query plan benchmark for the hot lookups, to check the indexes from the migrations are being used.
+Each query is explained twice: once with the migration indexes dropped inside a transaction that is rolled back
+afterwards (the "before" plan, normally a sequential scan), and once as the schema stands.
+The plans come from EXPLAIN ANALYZE, so they include the real execution time. Other databases only show the current plans.
+Dropping the indexes locks the tables until the rollback, so run it against a local copy rather than the live DB.
+Usage: python query_plans.py
+"""
+
+# indexes added by the migrations, dropped for the "before" plans
+MIGRATION_INDEXES = ['uq_boxers_name', 'ix_fights_boxer_a_id', 'ix_fights_boxer_b_id', 'ix_fights_winner_id', 'ix_fights_date']
+
+HOT_QUERIES = {
+    'boxer by name (scraper skip check, name resolution)': "SELECT * FROM boxers WHERE name = :name",
+    'fights of a boxer (/api/boxer/<id>)': "SELECT * FROM fights WHERE boxer_a_id = :boxer_id OR boxer_b_id = :boxer_id",
+    'wins of a boxer': "SELECT * FROM fights WHERE winner_id = :boxer_id",
+    'fights in a year (date ordered replays)':
+        "SELECT * FROM fights WHERE date >= :start AND date < :end ORDER BY date",
+}
+
+
+# a busy boxer to run the lookups for, so the plans reflect a realistic number of rows
+def sample_parameters(session):
+    row = session.execute(text("""
+        SELECT b.id, b.name FROM boxers b JOIN fights f ON f.boxer_a_id = b.id
+        GROUP BY b.id, b.name ORDER BY COUNT(*) DESC LIMIT 1""")).first()
+    boxer_id, name = row if row else (0, '')
+    return {'boxer_id': boxer_id, 'name': name, 'start': '1950-01-01', 'end': '1951-01-01'}
+
+
+def explain(session, query, parameters):
+    if session.get_bind().dialect.name == 'postgresql':
+        prefix = "EXPLAIN (ANALYZE, BUFFERS)"
+    else:
+        prefix = "EXPLAIN QUERY PLAN"
+    rows = session.execute(text(f"{prefix} {query}"), parameters).all()
+    return "\n".join("    " + str(row[-1]) for row in rows)
+
+
+def print_plans(session, title, parameters):
+    print(f"== {title} ==")
+    for name, query in HOT_QUERIES.items():
+        print(f"-- {name}")
+        print(explain(session, query, parameters))
+
+
+def compare_plans():
+    with new_session() as session:
+        parameters = sample_parameters(session)
+
+        # before: without the migration indexes, undone by the rollback
+        # only PostgreSQL rolls DDL back, so elsewhere just the current plans are shown
+        if session.get_bind().dialect.name != 'postgresql':
+            print_plans(session, "current schema", parameters)
+            return
+
+        for index in MIGRATION_INDEXES:
+            session.execute(text(f"DROP INDEX IF EXISTS {index}"))
+        print_plans(session, "without indexes", parameters)
+        session.rollback()
+
+        print_plans(session, "with indexes", parameters)
+        session.rollback()
+
+
+if __name__ == "__main__":
+    compare_plans()
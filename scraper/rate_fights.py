@@ -0,0 +1,42 @@
+# import general packages
+import sys
+import logging
+
+# import the standalone session factory
+from db_session import session_scope
+
+# import the rating engines
+from app.elo_engine import replay_elo
+from app.glicko_engine import replay_glicko
+from app.trueskill_engine import replay_trueskill
+
+"""
+Rates the fights table after a scrape or resolver run. By default the Elo replay only applies bouts added since the
+last run on top of the stored ratings; pass --full to replay the whole history from the base rating. A resolver run
+or a refresh that changed stored fights clears the watermark, so the next run replays the whole history anyway.
+Glicko-2 always recomputes the whole history, one rating period per year, and TrueSkill re-runs message passing
+over the whole fight graph.
+Usage: python rate_fights.py [--full]
+"""
+
+logging.basicConfig(
+    filename='scraper.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def rate_fights(full=False):
+    with session_scope() as session:
+        summary = replay_elo(session, full=full)
+        print(f"Elo: rated {summary['rated']} bouts, updated {summary['boxers']} boxers in {summary['seconds']:.3f}s "
+              f"({'full' if summary['full'] else 'incremental'} replay)")
+        summary = replay_glicko(session)
+        print(f"Glicko-2: rated {summary['bouts']} bouts over {summary['periods']} periods, "
+              f"updated {summary['boxers']} boxers in {summary['seconds']:.3f}s")
+        summary = replay_trueskill(session)
+        print(f"TrueSkill: rated {summary['bouts']} bouts in {summary['sweeps']} sweeps, "
+              f"updated {summary['boxers']} boxers in {summary['seconds']:.3f}s")
+
+
+if __name__ == '__main__':
+    rate_fights(full='--full' in sys.argv[1:])
@@ -0,0 +1,86 @@
+# import general packages
+import os
+import sys
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+# import progress bar utility
+from tqdm import tqdm
+
+# import extraction and batch loading from the main scraper
+from scraper import parse_data
+
+# import the batch loader selection (ORM or COPY)
+from copy_ingest import batch_loader
+
+# import the page cache, used to find stored pages in urls.txt order
+from page_cache import page_cache, find_saved_pages
+
+# number of extracted pages loaded into the DB per commit
+BATCH_SIZE = 50
+# number of pages sent to a worker process at a time, to keep inter-process overhead low
+CHUNK_SIZE = 8
+
+"""
+Re-extraction of a stored page corpus, for when the extraction rules in parse_data change.
+Parsing is CPU bound, so pages are spread over a pool of worker processes (one per core by default).
+Results come back in page order and are loaded into the DB in batches from this parent process only,
+so the workers never open database connections.
+Usage: python reparse.py [directory]  (defaults to the cached pages for urls.txt, in urls.txt order)
+Set INGEST_LOADER=copy to load through PostgreSQL COPY (copy_ingest.py) instead of the ORM.
+"""
+
+
+# worker process: read one stored page and run the extraction on it
+def parse_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    try:
+        return parse_data(html)
+    except Exception as e:
+        logging.error(f"Unable to parse {path}. {e}")
+        return None, None
+
+
+# list the stored pages for urls.txt from the page cache, keeping the order of urls.txt
+def cached_pages_for_urls(url_file="urls.txt"):
+    with open(url_file, 'r') as f:
+        url_list = [line.strip() for line in f if line.strip()]
+
+    pages = []
+    for url in url_list:
+        path = page_cache.path_for(url)
+        if path:
+            pages.append(path)
+        else:
+            logging.warning(f"{url} not in page cache. Skipping.")
+    return pages
+
+
+def reparse(directory=None, workers=None, batch_size=BATCH_SIZE, update=True, loader=None):
+    load, batch_size = batch_loader(loader, batch_size)
+    pages = find_saved_pages(directory) if directory else cached_pages_for_urls()
+    if not pages:
+        logging.error("No stored pages to re-parse.")
+        return
+
+    batch = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        # executor.map yields results in the same order as the input pages
+        results = executor.map(parse_file, pages, chunksize=CHUNK_SIZE)
+        for data, fight_matrix in tqdm(results, total=len(pages), desc="Re-parsing", unit="page"):
+            batch.append((data, fight_matrix))
+            if len(batch) >= batch_size:
+                load(batch, update=update)
+                batch = []
+
+    if batch:
+        load(batch, update=update)
+
+    logging.info(f"Re-parsed {len(pages)} pages")
+
+
+if __name__ == '__main__':
+    print('initiating re-parse')
+    reparse(*sys.argv[1:2])
+    print('re-parse complete')
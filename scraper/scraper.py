@@ -1,8 +1,11 @@
-# import Flask app
-import app
-
 # import regular expressions for advanced parsing
 import re
+import os
+
+# import timing and threading utilities for the pipeline stage timings
+import time
+import threading
+from contextlib import contextmanager
 
 # import progress bar utility
 from tqdm import tqdm
@@ -10,12 +13,29 @@ from tqdm import tqdm
 # import date parsing utility
 from dateutil import parser
 
-# import HTML parser and requests
-from bs4 import BeautifulSoup
-import requests
+# import HTML parser
+from bs4 import BeautifulSoup, SoupStrainer
+
+# import the shared on-disk page cache and the pooled HTTP client behind it
+from page_cache import page_cache
+from fetch_client import fetch_client
+
+# import concurrent fetching, and the per-host rate limiter a concurrent run hands to the fetch client
+from fetch_engine import fetch_concurrently, HostRateLimiter, MAX_WORKERS, REQUESTS_PER_SECOND
+
+# import the crawl-state journal for resumable runs
+from crawl_journal import CrawlJournal, fetch_latest_revisions, content_hash, page_revision
 
-# import database models
-from app.models import db, Boxer, Fight, RankingMetrics
+# import database models and the ON CONFLICT insert construct
+from app.models import Boxer, Fight, RankingMetrics, upsert
+from sqlalchemy import or_, select, update as sql_update
+
+# import the standalone session factory, so the scraper never builds the Flask app
+from db_session import session_scope, BatchSession, COMMIT_EVERY
+from app.models import DataVersion, RatingWatermark
+
+# import name normalisation and the trigram name index for opponent and winner resolution
+from app.names import normalize_name, NameIndex
 
 # import .env database credentials
 from dotenv import load_dotenv
@@ -37,29 +57,88 @@ def parse_date(date_str):
     except Exception:
         return None
 
-# helper function to check if boxer is already in db
-def boxer_exists(name):
-    with app.app_context():
-        return Boxer.query.filter_by(name=name).first() is not None
-
+# define a default fighter photo
+DEFAULT_BOXER_IMAGE = "https://www.nicepng.com/png/detail/272-2725101_silhouette-fighter.png"
 
+# helper class to time each pipeline stage across a batch, so a crawl shows where it spends its time
+# safe to use from the fetch worker threads
+class StageTimer:
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self.lock = threading.Lock()
 
-# function to fetch the contents of wiki pages. return error message to log file if unsuccessful
-def get_html_content(url):
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.totals[name] = self.totals.get(name, 0.0) + elapsed
+                self.counts[name] = self.counts.get(name, 0) + 1
+
+    # one line per stage: total seconds, number of pages and average per page
+    def summary(self):
+        lines = []
+        for name, total in self.totals.items():
+            count = self.counts[name]
+            lines.append(f"{name}: {total:.2f}s over {count} pages ({1000 * total / count:.1f}ms avg)")
+        return "\n".join(lines)
+
+
+# roster of every boxer in the db as a name index, loaded with one query for a whole batch run
+# callers add each boxer they insert, so the skip check and fight-id resolution never go back to the db
+def load_roster(session):
+    roster = NameIndex(session.query(Boxer.id, Boxer.name).all())
+    logging.info(f"Loaded roster of {len(roster)} boxers")
+    return roster
+
+
+
+# function to fetch the contents of wiki pages through the shared page cache. return error message to log file if unsuccessful
+# max_age=0 always revalidates, instead of trusting a page the link scraper fetched recently
+# limiter is the rate limiter of a concurrent run, or None for the fetch client's default
+def get_html_content(url, max_age=None, limiter=None):
     try:
         logging.info(f"Fetching URL: {url}")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.text
+        return page_cache.fetch(url, timeout=10, max_age=max_age, limiter=limiter)
     except Exception as e:
         logging.error(f"Error fetching {url}: {e}")
         return None
 
 
+# parsing mode for fetched pages, overridable from the .env file
+#   partial - lxml backend, keeping only the page title, infobox and wikitables (default)
+#   full    - html.parser over the whole article
+PARSE_MODE = os.getenv("PARSE_MODE", "partial")
+
+# the only page elements extract_data reads. a matched element is kept together with everything inside it
+# matched with a regex because the strainer sees the raw class string (e.g. "infobox vcard") while the page is parsed
+PAGE_STRAINER = SoupStrainer(attrs={'class': re.compile(r'(?:^|\s)(?:mw-page-title-main|infobox|wikitable)(?:\s|$)')})
+
+
+# build the parsed document for a fetched page. each page is parsed exactly once and the tree is shared by every stage
+# partial mode skips building the navigation, references and article prose, which make up most of a Wikipedia page
+def make_document(html, mode=None):
+    if (mode or PARSE_MODE) == 'partial':
+        return BeautifulSoup(html, 'lxml', parse_only=PAGE_STRAINER)
+    return BeautifulSoup(html, 'html.parser')
+
+
+# extract the fighter name from a parsed page, with the wiki disambiguation suffix removed
+def extract_name(soup):
+    return soup.find(class_='mw-page-title-main').text.replace(" (boxer)", "").strip()
+
+
 # parse the fetched data to retrieve information from the infobox and wiki tables
 def parse_data(html):
-    soup = BeautifulSoup(html, 'html.parser')
+    return extract_data(make_document(html))
+
 
+# extract the boxer data and fight matrix from an already parsed page
+def extract_data(soup):
     data = {}
 
     """
@@ -67,9 +146,7 @@ def parse_data(html):
     """
     # extract name
     try:
-        name = soup.find(class_='mw-page-title-main').text
-        name = name.replace(" (boxer)", "").strip()
-
+        name = extract_name(soup)
 
         # insert name into data dictionary
         data['name'] = name
@@ -86,9 +163,6 @@ def parse_data(html):
     # extract the table rows from the info card
     tr = info_card.find_all('tr')
 
-    # define a default fighter photo
-    DEFAULT_BOXER_IMAGE = "https://www.nicepng.com/png/detail/272-2725101_silhouette-fighter.png"
-
     for row in tr:
 
         # extract fighter photo
@@ -501,54 +575,80 @@ def parse_data(html):
     return data, fight_matrix
 
 
-# mapping of data to DB models and database insertion of boxer and ranking_metrics
-# return error message to log file if boxer already in DB
-def insert_boxer(data):
-    with app.app_context():
-        if not data.get('name'):
-            logging.warning("No name available. Skipping boxer.")
-            return
+# mapping of scraped data to the columns of the "boxers" table
+def boxer_fields(data):
+    return {
+        'name': data.get('name'),
+        'name_key': normalize_name(data.get('name')),
+        'photo': data.get('photo'),
+        'alias': data.get('alias'),
+        'birth_date': data.get('birth_date'),
+        'stance': data.get('stance'),
+        'height_cm': data.get('height_cm'),
+        'reach_cm': data.get('reach_cm'),
+        'active_from': data.get('active_from'),
+        'active_to': data.get('active_until'),
+        'era': data.get('era'),
+    }
+
+
+# mapping of scraped data to the columns of the "ranking_metrics" table
+def ranking_fields(data):
+    return {
+        'ko_ratio': data.get('ko_ratio'),
+        'win_ratio': data.get('win_ratio'),
+        'num_of_fights': data.get('num_of_fights'),
+        'wins': data.get('wins'),
+        'wins_by_ko': data.get('wins_by_ko'),
+        'wins_by_decision': data.get('wins_by_decision'),
+        'wins_by_dq': data.get('wins_by_dq'),
+        'losses': data.get('losses'),
+        'losses_by_ko': data.get('losses_by_ko'),
+        'losses_by_decision': data.get('losses_by_decision'),
+        'losses_by_dq': data.get('losses_by_dq'),
+    }
+
+
+# add a boxer and their ranking_metrics to the session without committing, returning the boxer id
+# existing boxers are skipped, or refreshed from the newly extracted data when update=True
+# both rows are written with INSERT ... ON CONFLICT on the unique name and boxer_id keys, so there is no read first
+def stage_boxer(session, data, update=False):
+    if not data.get('name'):
+        logging.warning("No name available. Skipping boxer.")
+        return None
 
-        existing = Boxer.query.filter_by(name=data['name']).first()
-        if existing:
-            logging.info(f"{data['name']} already in DB")
-            return
+    fields = boxer_fields(data)
+    statement = upsert(session, Boxer).values(**fields)
+    if update:
+        statement = statement.on_conflict_do_update(
+            index_elements=['name'], set_={k: v for k, v in fields.items() if k != 'name'})
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['name'])
+    boxer_id = session.execute(statement.returning(Boxer.id)).scalar()
+    if boxer_id is None:
+        logging.info(f"{data['name']} already in DB")
+        return None
 
-        boxer = Boxer(
-            name=data.get('name'),
-            photo=data.get('photo'),
-            alias=data.get('alias'),
-            birth_date=data.get('birth_date'),
-            stance=data.get('stance'),
-            height_cm=data.get('height_cm'),
-            reach_cm=data.get('reach_cm'),
-            active_from=data.get('active_from'),
-            active_to=data.get('active_until'),
-            era=data.get('era'),
-        )
+    metrics = ranking_fields(data)
+    statement = upsert(session, RankingMetrics).values(boxer_id=boxer_id, **metrics)
+    if update:
+        statement = statement.on_conflict_do_update(index_elements=['boxer_id'], set_=metrics)
+        logging.info(f"Updated {data['name']} in DB")
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=['boxer_id'])
+    session.execute(statement)
+    return boxer_id
 
-        db.session.add(boxer)
-        db.session.flush()
-
-        ranking_metrics = RankingMetrics(
-            boxer_id=boxer.id,
-            ko_ratio=data.get('ko_ratio'),
-            win_ratio=data.get('win_ratio'),
-            num_of_fights=data.get('num_of_fights'),
-            wins=data.get('wins'),
-            wins_by_ko=data.get('wins_by_ko'),
-            wins_by_decision=data.get('wins_by_decision'),
-            wins_by_dq=data.get('wins_by_dq'),
-            losses=data.get('losses'),
-            losses_by_ko=data.get('losses_by_ko'),
-            losses_by_decision=data.get('losses_by_decision'),
-            losses_by_dq=data.get('losses_by_dq'),
-        )
 
+# mapping of data to DB models and database insertion of boxer and ranking_metrics
+# return error message to log file if boxer already in DB
+def insert_boxer(data):
+    with session_scope() as session:
+        if not stage_boxer(session, data):
+            return
+        DataVersion.bump(session)
 
-        db.session.add(ranking_metrics)
-        db.session.commit()
-        logging.info(f"Inserted {boxer.name} into DB")
+    logging.info(f"Inserted {data['name']} into DB")
 
 
 # mapping the method section to adhere to db constraints
@@ -568,67 +668,253 @@ METHOD_MAPPING = {
     'NC': 'NC'
 }
 
-# database insertion into 'fights' table for each boxer
-def insert_fights(fight_matrix, data):
-    with app.app_context():
-        boxer = Boxer.query.filter_by(name=data['name']).first()
-        if not boxer:
-            logging.warning(f"No boxer found for: {data['name']}")
-            return
+# mapping of one row of the fight matrix to the columns of the "fights" table, without the boxer ids
+def fight_row(fight_data, boxer_name):
+    opponent_name = fight_data.get('Opponent')
+    winner_name = boxer_name if fight_data.get('Result') == "Win" else opponent_name
+
+    # normalise victory method to db constraints
+    raw_method = fight_data.get('Type', '').strip().upper()
+    method = METHOD_MAPPING.get(raw_method, None)
+    if method is None:
+        logging.warning(f"invalid fight method '{raw_method}', for fight {fight_data.get('No.')}")
+
+    # normalise dates before insertion to avoid errors
+    parsed_date = parse_date(fight_data.get('Date'))
+
+    return {
+        'date': parsed_date.date() if parsed_date else None,
+        'rounds_completed': fight_data.get('Round, time') or fight_data.get('Round') or None,
+        'location': fight_data.get('Location'),
+        'title_fight': bool(fight_data.get('Notes', '').strip()),
+        'opponent_name': opponent_name,
+        'winner_name': winner_name,
+        'method': method,
+    }
+
+
+# columns of a stored fight refreshed when its page is re-extracted. the natural key columns stay as they are
+FIGHT_UPDATE_COLUMNS = ('boxer_b_id', 'winner_id', 'bout_key', 'rounds_completed', 'method', 'location',
+                        'title_fight', 'winner_name')
 
-        # Not all ids available on first scraper pass, will be populated during second pass
-        for fight_data in fight_matrix:
-            opponent_name = fight_data.get('Opponent')
-            winner_name = boxer.name if fight_data.get('Result') == "Win" else opponent_name
 
-            # search for the id of boxer and opponent in the DB
-            opponent_boxer = Boxer.query.filter_by(name=opponent_name).first()
-            winner_boxer = Boxer.query.filter_by(name=winner_name).first()
+# canonical bout identity shared by the rows for one bout scraped from both fighters' pages, or None
+# while the opponent is not in the DB or the date is unknown
+def bout_key(boxer_a_id, boxer_b_id, date):
+    if not boxer_a_id or not boxer_b_id or not date:
+        return None
+    low, high = sorted((boxer_a_id, boxer_b_id))
+    return f"{low}-{high}-{date.isoformat()}"
+
+
+# add the fights for a boxer to the session without committing
+# a whole record costs a fixed handful of round trips: boxer lookup, one name resolution query
+# and a single executemany insert, however many bouts the boxer has
+# names are resolved through a NameIndex: the roster index of a batch when one is passed in, otherwise
+# one built from the boxers whose name or normalised name_key matches a name in this record
+# fights already stored are skipped by ON CONFLICT on the (date, boxer_a_id, opponent_name) key, or by an explicit
+# lookup when the date or opponent is missing, and bouts already stored from the opponent's page by their bout_key
+# with update=True, fights already stored from this boxer's page are refreshed from the new extraction instead
+def stage_fights(session, fight_matrix, data, name_index=None, update=False):
+    # the boxer is normally in the roster index already. the db is only asked when it is not
+    boxer_name = data['name']
+    boxer_id = name_index.exact(boxer_name) if name_index is not None else None
+    if not boxer_id:
+        boxer_id = session.query(Boxer.id).filter_by(name=boxer_name).scalar()
+    if not boxer_id:
+        logging.warning(f"No boxer found for: {boxer_name}")
+        return None
+
+    # resolve every opponent and winner name in one query against an in-memory name index
+    opponent_names = {fight_data.get('Opponent') for fight_data in fight_matrix if fight_data.get('Opponent')}
+    if name_index is None:
+        name_keys = {normalize_name(name) for name in opponent_names} - {None}
+        name_index = NameIndex(
+            session.query(Boxer.id, Boxer.name)
+            .filter(or_(Boxer.name.in_(opponent_names), Boxer.name_key.in_(name_keys))).all()
+        )
+
+    # fights seen earlier in this record
+    seen_fights = set()
+
+    # Not all ids available on first scraper pass, will be populated during second pass
+    rows = []
+    for fight_data in fight_matrix:
+        row = fight_row(fight_data, boxer_name)
+        opponent_name = row['opponent_name']
+        winner_name = row['winner_name']
+
+        # if the fight appears earlier in this record, skip the fight
+        if (row['date'], opponent_name) in seen_fights:
+            logging.info(f"Skipping duplicate fight vs {opponent_name} on {row['date']} ")
+            continue
+        seen_fights.add((row['date'], opponent_name))
+
+        # look up the id of boxer and opponent in the name index
+        row['boxer_a_id'] = boxer_id
+        row['boxer_b_id'] = name_index.resolve(opponent_name)
+        row['winner_id'] = boxer_id if winner_name == boxer_name else name_index.resolve(winner_name)
+        row['bout_key'] = bout_key(boxer_id, row['boxer_b_id'], row['date'])
+        rows.append(row)
+
+        if not row['boxer_b_id'] or not row['winner_id']:
+            logging.warning(f"unable to set all IDs for fight {fight_data.get('No.')}. Opponent: {opponent_name}, winner: {winner_name}")
+
+    # drop bouts already stored as the mirror row from the opponent's page, in one query.
+    # a refresh keeps this boxer's own stored rows, so they can be updated
+    bout_keys = {row['bout_key'] for row in rows if row['bout_key']}
+    if bout_keys:
+        query = select(Fight.bout_key).filter(Fight.bout_key.in_(bout_keys))
+        if update:
+            query = query.filter(Fight.boxer_a_id != boxer_id)
+        stored_bouts = set(session.scalars(query))
+        rows = [row for row in rows if row['bout_key'] not in stored_bouts]
+
+    # a unique index treats NULLs as distinct, so fights without a date or opponent never hit ON CONFLICT.
+    # they are matched against the stored rows of this boxer in one query, and skipped or refreshed by id
+    if any(row['date'] is None or row['opponent_name'] is None for row in rows):
+        stored = {(date, opponent_name): fight_id for fight_id, date, opponent_name in session.execute(
+            select(Fight.id, Fight.date, Fight.opponent_name)
+            .filter(Fight.boxer_a_id == boxer_id, or_(Fight.date.is_(None), Fight.opponent_name.is_(None))))}
+        matched = [row for row in rows if (row['date'], row['opponent_name']) in stored]
+        if matched:
+            rows = [row for row in rows if (row['date'], row['opponent_name']) not in stored]
+            if update:
+                session.execute(sql_update(Fight), [
+                    {'id': stored[(row['date'], row['opponent_name'])], **{c: row[c] for c in FIGHT_UPDATE_COLUMNS}}
+                    for row in matched])
+
+    # insert all new fights in a single executemany, leaving fights already in db untouched or refreshing them
+    if rows:
+        statement = upsert(session, Fight)
+        if update:
+            statement = statement.on_conflict_do_update(
+                index_elements=['date', 'boxer_a_id', 'opponent_name'],
+                set_={column: getattr(statement.excluded, column) for column in FIGHT_UPDATE_COLUMNS})
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=['date', 'boxer_a_id', 'opponent_name'])
+        session.execute(statement, rows)
+
+    # refreshed fights may already have been rated, so the next rating run replays the whole history
+    if update:
+        RatingWatermark.reset(session)
 
-            # normalise victory method to db constraints
-            raw_method = fight_data.get('Type', '').strip().upper()
-            method = METHOD_MAPPING.get(raw_method, None)
+    return boxer_id
 
-            # normalise dates before insertion to avoid errors
-            raw_date = fight_data.get('Date')
-            parsed_date = parse_date(raw_date)
-            iso_date = parsed_date.strftime('%Y-%m-%d') if parsed_date else None
 
-            # make a composite key to check for duplicates
-            existing_fight = Fight.query.filter_by(date=iso_date, boxer_a_id=boxer.id, opponent_name=opponent_name).first()
+# database insertion into 'fights' table for each boxer
+def insert_fights(fight_matrix, data):
+    with session_scope() as session:
+        if not stage_fights(session, fight_matrix, data):
+            return
+        DataVersion.bump(session)
+
+    logging.info(f"Inserted {len(fight_matrix)} fights for {data['name']}")
+
 
-            # if existing_fight is already in db, skip the fight
-            if existing_fight:
-                logging.info(f"Skipping duplicate fight vs {opponent_name} on {iso_date} ")
+# load a batch of extracted pages in one session with a single commit
+# update=True refreshes boxers and fights that are already in the DB, for re-extraction runs
+# names are resolved against a roster index loaded once for the batch, and kept current as boxers are added
+def load_batch(results, update=False):
+    with session_scope() as session:
+        name_index = load_roster(session)
+        for data, fight_matrix in results:
+            if not data:
                 continue
+            boxer_id = stage_boxer(session, data, update=update)
+            if boxer_id:
+                name_index.add(boxer_id, data['name'])
+            if fight_matrix:
+                stage_fights(session, fight_matrix, data, name_index, update=update)
+        DataVersion.bump(session)
+
+    logging.info(f"Loaded batch of {len(results)} pages")
+
+
+
+"""
+Batch pipeline. Each page flows through four stages, and a single parsed document is shared between them:
+fetch (download or read from the page cache) -> parse (build the tree once) -> extract (data and fight matrix) -> load (DB insert)
+Boxers already in the DB are skipped after the parse stage, before any extraction work is done.
+With a crawl journal, every finished page is recorded with its content hash and revision id, and a page
+whose revision changed since it was last extracted refreshes the boxer instead of being skipped.
+All database work goes through the batch session; a loaded page is only journalled once its transaction commits,
+and a page the database rejects is rolled back to its savepoint and journalled as failed.
+"""
+def process_page(url, html, timer, batch, roster, journal=None):
+    page_hash = revision_id = None
+    refresh = False
+    if journal:
+        page_hash = content_hash(html)
+        revision_id = page_revision(html)
+        entry = journal.get(url)
+        if entry and entry['status'] == 'done':
+            # unchanged content needs no extraction at all
+            if entry['content_hash'] == page_hash:
+                journal.record(url, 'done', page_hash, revision_id)
+                return
+            refresh = entry['revision_id'] != revision_id
+
+    # parse stage
+    with timer.stage('parse'):
+        soup = make_document(html)
 
-            fight = Fight(
-                date=iso_date,
-                rounds_completed=fight_data.get('Round, time') or fight_data.get('Round') or None,
-                location=fight_data.get('Location'),
-                title_fight=bool(fight_data.get('Notes', '').strip()),
-                boxer_a_id=boxer.id,
-                boxer_b_id=opponent_boxer.id if opponent_boxer else None,
-                winner_id=winner_boxer.id if winner_boxer else None,
-                opponent_name=opponent_name,
-                winner_name=winner_name,
-                method=method,
-            )
-            if method is None:
-                logging.warning(f"invalid fight method '{raw_method}', for fight {fight_data.get('No.')}")
+    try:
+        name = extract_name(soup)
+    except Exception as e:
+        logging.warning(f"unable to extract fighter name: {url}. Skipping. {e}")
+        if journal:
+            journal.record(url, 'failed', page_hash, revision_id, error=str(e))
+        return
 
-            if not opponent_boxer or not winner_boxer:
-                logging.warning(f"unable to set all IDs for fight {fight_data.get('No.')}. Opponent: {opponent_name}, winner: {winner_name}")
+    # skip boxers already in the db, checked against the in-memory roster
+    if not refresh:
+        with timer.stage('skip check'):
+            exists = name in roster
+        if exists:
+            logging.info(f"{name} already exists in DB. Skipping.")
+            if journal:
+                journal.record(url, 'done', page_hash, revision_id)
+            return
 
-            db.session.add(fight)
+    # extract stage
+    with timer.stage('extract'):
+        data, fight_matrix = extract_data(soup)
+    if not data:
+        logging.warning(f"No data returned for {url}. Skipping data insertion")
+        if journal:
+            journal.record(url, 'failed', page_hash, revision_id, error="no data extracted")
+        return
 
-        db.session.commit()
-        logging.info(f"Inserted {len(fight_matrix)} fights for {boxer.name}")
+    # load stage
+    with timer.stage('load'):
+        if refresh:
+            logging.info(f"{name} revision changed to {revision_id}. Refreshing.")
+        with batch.page(url):
+            boxer_id = stage_boxer(batch.session, data, update=refresh)
+            if fight_matrix:
+                stage_fights(batch.session, fight_matrix, data, roster, update=refresh)
+    if batch.failed:
+        if journal:
+            journal.record(url, 'failed', page_hash, revision_id, error="database error")
+        return
+    # the roster only learns the boxer once the page is staged, so a discarded page leaves no stale id behind
+    if boxer_id:
+        roster.add(boxer_id, data['name'])
 
+    if journal:
+        batch.done(lambda: journal.record(url, 'done', page_hash, revision_id))
+    else:
+        batch.done()
 
 
 # batch URL scraper
-def batch_scrape():
+# with concurrent=True, pages are downloaded by a pool of worker threads under a per-host rate limit,
+# which only counts requests that go over the network, not pages served from the page cache
+# and handed to the parse/insert stages in the main thread as soon as each one arrives
+# with resume=True, the crawl journal skips finished pages and only re-extracts pages with a new revision
+def batch_scrape(concurrent=False, max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND, resume=False,
+                 commit_every=COMMIT_EVERY):
     try:
         with open("urls.txt", 'r') as f:
             url_list = [line.strip() for line in f if line.strip()]
@@ -640,45 +926,56 @@ def batch_scrape():
         logging.error("No URLs to process.")
         return
 
-    # track profile scraping with a progress bar, and track in log file
-    for idx, url in enumerate(tqdm(url_list, desc="Scraping progress", unit="fighter")):
-        logging.info(f"Processing URL: {url}")
+    journal = None
+    if resume:
+        journal = CrawlJournal()
+        total = len(url_list)
+        url_list = journal.pending(url_list, fetch_latest_revisions(url_list))
+        logging.info(f"crawl journal: {len(url_list)} of {total} URLs new, unfinished or revised")
 
-        html = get_html_content(url)
-        if not html:
-            continue
+    timer = StageTimer()
 
-        html = get_html_content(url)
-        if not html:
-            continue
+    # a concurrent run has its own per-host rate limit, and a sequential one uses the fetch client's default
+    limiter = HostRateLimiter(rate=requests_per_second, burst=max_workers) if concurrent else None
 
-        # quick parse of the fighter name to avoid parsing the entire page if boxer already in db
-        soup = BeautifulSoup(html, 'html.parser')
-        try:
-            name = soup.find(class_='mw-page-title-main').text.strip()
-        except Exception as e:
-            logging.warning(f"unable to extract fighter name: {url}. Skipping. {e}")
-            continue
+    # fetch stage. a resumed run is looking for new revisions, so it never serves pages without revalidating
+    def timed_fetch(url):
+        with timer.stage('fetch'):
+            return get_html_content(url, max_age=0 if resume else None, limiter=limiter)
 
-        # use helper function to verify is boxer already in db
-        if boxer_exists(name):
-            logging.info(f"{name} already exists in DB. Skipping.")
-            continue
+    if concurrent:
+        pages = fetch_concurrently(url_list, timed_fetch, max_workers=max_workers)
+    else:
+        pages = ((url, timed_fetch(url)) for url in url_list)
 
-        data, fight_matrix = parse_data(html)
-        if not data:
-            logging.warning(f"No data returned for {url}. Skipping data insertion")
-            continue
+    # track profile scraping with a progress bar, and track in log file
+    # database work stays on this thread in one session, committed every commit_every boxers
+    # concurrent workers only download
+    # the roster is loaded once and kept current in memory, so skipping a boxer already in the db costs no query
+    with BatchSession(commit_every) as batch:
+        roster = load_roster(batch.session)
+        for url, html in tqdm(pages, total=len(url_list), desc="Scraping progress", unit="fighter"):
+            logging.info(f"Processing URL: {url}")
+            if not html:
+                if journal:
+                    journal.record(url, 'failed', error="fetch failed")
+                continue
+            process_page(url, html, timer, batch, roster, journal)
 
-        insert_boxer(data)
-        if fight_matrix:
-            insert_fights(fight_matrix, data)
+    if journal:
+        journal.close()
+
+    # fetch time is summed over all workers, so in concurrent mode it can exceed the wall clock time
+    logging.info(f"stage timings:\n{timer.summary()}")
+    logging.info(page_cache.summary())
+    logging.info(fetch_client.summary())
 
 
 """ command line tool for testing purposes and insertion of fighters into DB
-# s-mode for single URLs, b-mode for batch .txt files with URLs """
+# s-mode for single URLs, b-mode for batch .txt files with URLs, c-mode for a concurrent batch,
+# r-mode to resume an interrupted batch and refresh boxers whose pages have been revised """
 def main():
-    mode = input("Choose mode - single (s) or batch (b): ").strip().lower()
+    mode = input("Choose mode - single (s), batch (b), concurrent batch (c) or resume/refresh (r): ").strip().lower()
 
     if mode == 's':
         url = input("Enter Wikipedia Boxer URL: ").strip()
@@ -694,6 +991,16 @@ def main():
         batch_scrape()
         print('scraping complete')
 
+    elif mode == 'c':
+        print('initiating concurrent scrape')
+        batch_scrape(concurrent=True)
+        print('scraping complete')
+
+    elif mode == 'r':
+        print('resuming scrape from the crawl journal')
+        batch_scrape(concurrent=True, resume=True)
+        print('scraping complete')
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
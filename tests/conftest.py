@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, event
+
+# the web app is imported as the `app` package from the repository root, and the scraper modules import each
+# other as plain modules from scraper/, as they do when run as scripts
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scraper'))
+
+
+# an empty SQLite database with the full schema, used by the scraper's standalone session factory
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    import db_session
+    from app import db
+    import app.models  # noqa: F401, registers the tables
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    # let SQLAlchemy issue BEGIN itself, so SAVEPOINT behaves as it does on PostgreSQL
+    @event.listens_for(engine, "connect")
+    def no_implicit_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    db.metadata.create_all(engine)
+    monkeypatch.setattr(db_session, '_engine', engine)
+    db_session.Session.configure(bind=engine)
+    yield engine
+    db_session.Session.configure(bind=None)
+    engine.dispose()
+
+
+# the web app served from the db_engine database, with the shared ratings snapshots emptied so nothing loaded
+# from another test's database is served
+@pytest.fixture
+def web_app(db_engine, monkeypatch):
+    import config
+    from app import create_app, ratings
+
+    monkeypatch.setattr(config, 'DATABASE_URL', str(db_engine.url))
+    monkeypatch.setattr(config, 'SNAPSHOT_PATH', None)
+    for snapshot in vars(ratings).values():
+        if isinstance(snapshot, ratings.RatingsSnapshot):
+            monkeypatch.setattr(snapshot, 'state', None)
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+# stores resolved fights in the db_engine database: add_bouts(bouts, names=(), method='KO'), one
+# (boxer_a_id, boxer_b_id, winner_id, year) tuple per bout, after creating the named boxers with ids from 1
+@pytest.fixture
+def add_bouts(db_engine):
+    import datetime
+    from sqlalchemy import insert
+    from app.models import Boxer, Fight
+
+    def add(bouts, names=(), method='KO'):
+        with db_engine.begin() as conn:
+            if names:
+                conn.execute(insert(Boxer), [{'id': i, 'name': name, 'photo': ''} for i, name in enumerate(names, 1)])
+            if bouts:
+                conn.execute(insert(Fight), [
+                    {'boxer_a_id': a, 'boxer_b_id': b, 'winner_id': winner, 'date': datetime.date(year, 1, 1),
+                     'opponent_name': str(b), 'method': method} for a, b, winner, year in bouts])
+    return add
@@ -0,0 +1,19 @@
+from copy_ingest import collect_rows, resolve_fight_ids, FIGHT_COLUMNS
+from app.names import NameIndex
+
+LOUIS = {'name': 'Joe Louis', 'photo': ''}
+FIGHTS = [
+    {'Opponent': 'Max Schmelling', 'Result': 'Loss', 'Type': 'KO', 'Date': 'Jun 19, 1936'},
+    {'Opponent': 'Max Schmeling (boxer)', 'Result': 'Win', 'Type': 'TKO', 'Date': 'Jun 22, 1938'},
+    {'Opponent': 'Billy Conn', 'Result': 'Win', 'Type': 'KO', 'Date': 'Jun 18, 1941'},
+]
+
+
+# staged fights get the ids the ORM loader would give them: misspelt and suffixed names resolve, unknown ones stay NULL
+def test_staged_fights_resolve_names_through_the_name_index():
+    _, _, fights = collect_rows([(LOUIS, FIGHTS)])
+    name_index = NameIndex([(1, 'Joe Louis'), (2, 'Max Schmeling')])
+
+    rows = resolve_fight_ids(fights, name_index)
+    ids = [row[len(FIGHT_COLUMNS) + 1:] for row in rows]
+    assert ids == [[2, 2], [2, 1], [None, 1]]
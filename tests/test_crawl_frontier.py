@@ -0,0 +1,46 @@
+import requests
+
+import heavyweight_link_scraper
+from crawl_frontier import crawl
+from fetch_client import fetch_client
+from page_cache import PageCache
+
+from test_fetch import CountingLimiter
+
+CATEGORY = "https://en.wikipedia.org/wiki/Category:Heavyweight_boxers"
+NEXT_PAGE = "https://en.wikipedia.org/w/index.php?title=Category:Heavyweight_boxers&pagefrom=M"
+SUBCATEGORY = "https://en.wikipedia.org/wiki/Category:Olympic_boxers"
+
+PAGES = {
+    CATEGORY: '''<div id="mw-subcategories"><a href="/wiki/Category:Olympic_boxers">Olympic boxers</a></div>
+                 <div id="mw-pages"><a href="/wiki/Joe_Louis">Joe Louis</a>
+                 <a href="/w/index.php?title=Category:Heavyweight_boxers&amp;pagefrom=M">next page</a></div>''',
+    NEXT_PAGE: '<div id="mw-pages"><a href="/wiki/Max_Baer">Max Baer</a><a href="/wiki/Joe_Louis">Joe Louis</a></div>',
+    SUBCATEGORY: '<div id="mw-pages"><a href="/wiki/Teofilo_Stevenson">Teofilo Stevenson</a></div>',
+}
+
+
+def category_page(url, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = PAGES[url].encode('utf-8')
+    response.encoding = 'utf-8'
+    return response
+
+
+def test_category_pages_take_rate_limit_tokens(tmp_path, monkeypatch):
+    limiter = CountingLimiter()
+    monkeypatch.setattr(fetch_client, 'limiter', limiter)
+    monkeypatch.setattr(fetch_client.session, 'get', category_page)
+    monkeypatch.setattr(heavyweight_link_scraper, 'page_cache', PageCache(directory=str(tmp_path)))
+
+    assert list(crawl([CATEGORY], max_depth=1)) == [
+        "https://en.wikipedia.org/wiki/Joe_Louis",
+        "https://en.wikipedia.org/wiki/Max_Baer",
+        "https://en.wikipedia.org/wiki/Teofilo_Stevenson",
+    ]
+    assert sorted(limiter.calls) == sorted(PAGES)
+
+    # a second crawl is served by the page cache and sends nothing
+    list(crawl([CATEGORY], max_depth=1))
+    assert len(limiter.calls) == len(PAGES)
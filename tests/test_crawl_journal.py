@@ -0,0 +1,45 @@
+import requests
+
+import crawl_journal
+from crawl_journal import fetch_latest_revisions
+
+
+class ApiResponse(requests.Response):
+    def __init__(self, payload):
+        super().__init__()
+        self.status_code = 200
+        self.payload = payload
+
+    def json(self, **kwargs):
+        return self.payload
+
+
+def test_revisions_follow_normalised_and_redirected_titles(monkeypatch):
+    calls = []
+
+    def get(url, **kwargs):
+        calls.append(kwargs['params'])
+        return ApiResponse({'query': {
+            'normalized': [{'from': 'joe louis', 'to': 'Joe louis'}],
+            'redirects': [{'from': 'Joe louis', 'to': 'Joe Louis'},
+                          {'from': 'Cassius Clay', 'to': 'Muhammad Ali'}],
+            'pages': [
+                {'pageid': 1, 'title': 'Joe Louis', 'revisions': [{'revid': 101}]},
+                {'pageid': 2, 'title': 'Muhammad Ali', 'revisions': [{'revid': 202}]},
+                {'pageid': 3, 'title': 'Max Baer', 'revisions': [{'revid': 303}]},
+                {'title': 'Nobody', 'missing': True},
+            ],
+        }})
+
+    monkeypatch.setattr(crawl_journal.fetch_client, 'get', get)
+    urls = ['https://en.wikipedia.org/wiki/joe_louis', 'https://en.wikipedia.org/wiki/Joe_Louis',
+            'https://en.wikipedia.org/wiki/Cassius_Clay', 'https://en.wikipedia.org/wiki/Max_Baer',
+            'https://en.wikipedia.org/wiki/Nobody']
+
+    assert fetch_latest_revisions(urls) == {
+        'https://en.wikipedia.org/wiki/joe_louis': 101,
+        'https://en.wikipedia.org/wiki/Joe_Louis': 101,
+        'https://en.wikipedia.org/wiki/Cassius_Clay': 202,
+        'https://en.wikipedia.org/wiki/Max_Baer': 303,
+    }
+    assert calls[0]['redirects'] == 1
@@ -0,0 +1,29 @@
+import datetime
+
+from sqlalchemy import insert, select
+
+from db_info_resolver import resolve_fights
+from app.models import Boxer, Fight
+
+
+def test_fuzzy_matches_are_written_back_and_generations_kept_apart(db_engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with db_engine.begin() as conn:
+        conn.execute(insert(Boxer), [{'id': 1, 'name': 'Joe Louis', 'photo': ''},
+                                     {'id': 2, 'name': 'Max Schmeling', 'photo': ''},
+                                     {'id': 3, 'name': 'Ken Norton', 'photo': ''}])
+        conn.execute(insert(Fight), [
+            {'boxer_a_id': 1, 'date': datetime.date(1936, 6, 19), 'opponent_name': 'Max Schmelling',
+             'winner_name': 'Max Schmelling'},
+            {'boxer_a_id': 1, 'date': datetime.date(1938, 6, 22), 'opponent_name': 'Max Schmeling',
+             'winner_name': 'Joe Louis'},
+            {'boxer_a_id': 1, 'date': datetime.date(1990, 1, 1), 'opponent_name': 'Ken Norton Jr.',
+             'winner_name': 'Ken Norton Jr.'},
+        ])
+
+    resolve_fights()
+
+    with db_engine.connect() as conn:
+        rows = conn.execute(select(Fight.opponent_name, Fight.boxer_b_id, Fight.winner_id).order_by(Fight.date)).all()
+    assert rows == [('Max Schmelling', 2, 2), ('Max Schmeling', 2, 1), ('Ken Norton Jr.', None, None)]
+    assert (tmp_path / 'db_resolver_unresolved_opponents.log').read_text() == 'Ken Norton Jr.\n'
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import insert, select
+
+from conftest import ROOT
+from db_session import BatchSession
+from app.models import Boxer
+
+
+def test_scraper_imports_without_database_settings():
+    env = {key: value for key, value in os.environ.items() if key not in ('user', 'password', 'host', 'port', 'dbname')}
+    env['PYTHONPATH'] = ROOT
+    result = subprocess.run([sys.executable, '-c', 'import scraper, copy_ingest, rate_fights'],
+                            cwd=os.path.join(ROOT, 'scraper'), env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_failed_page_discards_only_that_page(db_engine):
+    with BatchSession(commit_every=10) as batch:
+        with batch.page('first'):
+            batch.session.execute(insert(Boxer), [{'name': 'Joe Louis', 'photo': ''}])
+        assert not batch.failed
+        batch.done()
+
+        # a duplicate name violates uq_boxers_name
+        with batch.page('second'):
+            batch.session.execute(insert(Boxer), [{'name': 'Max Baer', 'photo': ''}])
+            batch.session.execute(insert(Boxer), [{'name': 'Joe Louis', 'photo': ''}])
+        assert batch.failed
+
+        with batch.page('third'):
+            batch.session.execute(insert(Boxer), [{'name': 'Max Schmeling', 'photo': ''}])
+        assert not batch.failed
+        batch.done()
+
+    with db_engine.connect() as conn:
+        names = conn.scalars(select(Boxer.name).order_by(Boxer.name)).all()
+    assert names == ['Joe Louis', 'Max Schmeling']
@@ -0,0 +1,68 @@
+import os
+
+from conftest import ROOT
+from dump_ingest import parse_wikitext
+from heavyweight_link_scraper import html_contains_fight_table
+
+INFOBOX = """{{Infobox boxer
+| name = %s
+| image = %s.jpg
+| nickname = "The Giant"
+| height = {{height|m=1.96}}
+| stance = [[Orthodox stance|Orthodox]]
+| birth_date = {{birth date|1952|03|29}}
+}}
+"""
+
+PRO = INFOBOX % ('Jürgen Blin', 'Jürgen Blin') + """
+'''Jürgen Blin''' is a German former professional boxer.
+
+==Professional boxing record==
+{{BoxingRecordSummary
+|total-fights=2 |total-wins=2 |total-losses=0
+|wins-ko=1 |wins-dec=1
+}}
+{| class="wikitable" style="text-align:center"
+! No. !! Result !! Record !! Opponent !! Type !! Round, time !! Date !! Location !! Notes
+|-
+| 2 || Win || 2–0 || [[Jean-Pierre Coopman]] || RTD || 3 (6), 3:00 || {{dts|1969|07|07}} || Kiel, West Germany ||
+|-
+| 1 || Win || 1–0 || Horst Benedens || KO || 1 (4), 0:59 || {{dts|1969|04|01}} || Hamburg, West Germany || Professional debut
+|}
+
+[[Category:Heavyweight boxers]]
+"""
+
+AMATEUR = INFOBOX % ('Teófilo Stevenson', 'Teofilo Stevenson') + """
+'''Teófilo Stevenson''' was a Cuban amateur boxer.
+
+==Olympic results==
+{| class="wikitable"
+! Games !! Opponent !! Result
+|-
+| 1972 Munich || Ion Alexe || Walkover
+|}
+
+[[Category:Heavyweight boxers]]
+"""
+
+
+def test_professional_pages_are_ingested():
+    data, fight_matrix = parse_wikitext('Jürgen Blin (boxer)', PRO)
+    assert data['name'] == 'Jürgen Blin'
+    assert data['num_of_fights'] == 2
+    assert [fight['Opponent'] for fight in fight_matrix] == ['Jean-Pierre Coopman', 'Horst Benedens']
+
+
+def test_amateur_pages_are_skipped():
+    assert parse_wikitext('Teófilo Stevenson', AMATEUR) == (None, None)
+
+
+def test_same_rule_as_the_link_scraper():
+    # the saved HTML of the same two boxers, classified by the link scraper
+    def classify(name):
+        with open(os.path.join(ROOT, 'tests', 'fixtures', 'pages', name), 'r', encoding='utf-8') as f:
+            return html_contains_fight_table(f.read())
+
+    assert classify('jurgen_blin_boxer.html')
+    assert not classify('teofilo_stevenson.html')
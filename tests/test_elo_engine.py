@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+from sqlalchemy import insert, select
+
+import db_session
+from db_info_resolver import resolve_fights
+from app.elo_engine import replay_elo
+from app.logic import elo_winner
+from app.models import Boxer, Fight, RankingMetrics
+from app.ratings import BASE_RATING
+
+
+def replay(full=False):
+    with db_session.session_scope() as session:
+        return replay_elo(session, full=full)
+
+
+def elo_ratings(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(select(RankingMetrics.boxer_id, RankingMetrics.elo_rating)
+                                 .order_by(RankingMetrics.boxer_id)).all())
+
+
+def test_replay_rates_winners_up_and_keeps_the_total(add_bouts, db_engine):
+    add_bouts([(2, 1, 2, 1936), (1, 2, 1, 1938), (1, 3, 1, 1941)],
+              names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+
+    summary = replay()
+    assert summary['full'] and summary['rated'] == 3
+
+    ratings = elo_ratings(db_engine)
+    assert ratings[1] > BASE_RATING > ratings[3]
+    assert sum(ratings.values()) == pytest.approx(3 * BASE_RATING)
+
+
+def test_incremental_replay_matches_a_full_one(add_bouts, db_engine):
+    add_bouts([(2, 1, 2, 1936), (1, 2, 1, 1938)], names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    replay()
+
+    add_bouts([(1, 3, 1, 1941), (3, 2, 3, 1942)])
+    summary = replay()
+    assert not summary['full'] and summary['rated'] == 2
+    incremental = elo_ratings(db_engine)
+
+    replay(full=True)
+    assert elo_ratings(db_engine) == pytest.approx(incremental)
+
+
+def test_fights_resolved_below_the_watermark_are_rated(add_bouts, db_engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    add_bouts([], names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    # the 1936 bout is stored first, before its opponent could be resolved
+    with db_engine.begin() as conn:
+        conn.execute(insert(Fight), [{'boxer_a_id': 1, 'date': datetime.date(1936, 6, 19),
+                                      'opponent_name': 'Max Schmeling', 'winner_name': 'Max Schmeling'}])
+    add_bouts([(1, 3, 1, 1941)])
+    assert replay()['rated'] == 1
+
+    resolve_fights()
+    summary = replay()
+    assert summary['full'] and summary['rated'] == 2
+    resolved = elo_ratings(db_engine)
+
+    replay(full=True)
+    assert elo_ratings(db_engine) == pytest.approx(resolved)
+
+
+def test_elo_winner_reads_the_replayed_ratings(add_bouts, web_app, db_engine):
+    add_bouts([], names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    # Conn's record looks better on paper, but Schmeling beat the Elo leader
+    with db_engine.begin() as conn:
+        conn.execute(insert(RankingMetrics), [
+            {'boxer_id': 2, 'win_ratio': 0.5, 'ko_ratio': 0.5, 'wins': 1, 'losses': 1},
+            {'boxer_id': 3, 'win_ratio': 1.0, 'ko_ratio': 1.0, 'wins': 5, 'losses': 0}])
+    add_bouts([(2, 1, 2, 1936), (1, 2, 1, 1938), (1, 3, 1, 1941)])
+    replay()
+
+    winner_id, probability, _, differential, _ = elo_winner(Boxer(id=2), Boxer(id=3))
+    ratings = elo_ratings(db_engine)
+    assert winner_id == 2 and probability > 0.5
+    assert differential == f"Elo rating disparity = {ratings[2] - ratings[3]:.2f}"
@@ -0,0 +1,128 @@
+import requests
+
+import fetch_client as fetch_client_module
+from fetch_client import fetch_client
+from page_cache import PageCache
+
+URL = "https://en.wikipedia.org/wiki/Joe_Louis"
+BODY = "<html><body>Joe Louis</body></html>"
+
+
+# limiter that records every token taken instead of sleeping
+class CountingLimiter:
+    def __init__(self):
+        self.calls = []
+
+    def acquire(self, url):
+        self.calls.append(url)
+
+
+def ok_response(*args, **kwargs):
+    response = requests.Response()
+    response.status_code = 200
+    response._content = BODY.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.headers['ETag'] = '"v1"'
+    return response
+
+
+def test_page_cache_hits_take_no_rate_limit_tokens(tmp_path, monkeypatch):
+    limiter = CountingLimiter()
+    monkeypatch.setattr(fetch_client, 'limiter', limiter)
+    monkeypatch.setattr(fetch_client.session, 'get', ok_response)
+
+    cache = PageCache(directory=str(tmp_path), max_age=3600)
+    assert cache.fetch(URL) == BODY
+    assert cache.fetch(URL) == BODY
+    assert PageCache(directory=str(tmp_path), mode='offline').fetch(URL) == BODY
+
+    # only the download went over the network
+    assert limiter.calls == [URL]
+    assert cache.stats['downloaded'] == 1 and cache.stats['fresh'] == 1
+
+
+def test_every_network_attempt_takes_a_token(monkeypatch):
+    limiter = CountingLimiter()
+    monkeypatch.setattr(fetch_client, 'limiter', limiter)
+    responses = iter([503, 200])
+
+    def flaky_get(*args, **kwargs):
+        response = ok_response()
+        response.status_code = next(responses)
+        response.headers['Retry-After'] = '0'
+        return response
+
+    monkeypatch.setattr(fetch_client.session, 'get', flaky_get)
+    assert fetch_client.get(URL).status_code == 200
+    assert limiter.calls == [URL, URL]
+
+
+# a requests response over a gzip-encoded urllib3 body, as the adapter builds it for a real download
+def gzip_response(*args, **kwargs):
+    import io
+    import gzip
+    from urllib3 import HTTPResponse
+    from requests.adapters import HTTPAdapter
+
+    body = (BODY * 200).encode('utf-8')
+    raw = HTTPResponse(body=io.BytesIO(gzip.compress(body)), headers={'Content-Encoding': 'gzip'}, status=200,
+                       preload_content=False, decode_content=True)
+    request = requests.Request('GET', URL).prepare()
+    return HTTPAdapter().build_response(request, raw)
+
+
+def test_bytes_downloaded_counts_compressed_bytes(tmp_path, monkeypatch):
+    import gzip
+    monkeypatch.setattr(fetch_client, 'limiter', CountingLimiter())
+    monkeypatch.setattr(fetch_client.session, 'get', gzip_response)
+
+    cache = PageCache(directory=str(tmp_path))
+    assert cache.fetch(URL) == BODY * 200
+    assert cache.stats['bytes_downloaded'] == len(gzip.compress((BODY * 200).encode('utf-8')))
+    assert cache.stats['bytes_decoded'] == len(BODY * 200)
+    assert "saved by compression" in cache.summary()
+
+
+def test_retry_after_is_waited_out_in_full(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fetch_client, 'limiter', CountingLimiter())
+    monkeypatch.setattr(fetch_client_module.time, 'sleep', sleeps.append)
+    responses = iter([429, 200])
+
+    def rate_limited_get(*args, **kwargs):
+        response = ok_response()
+        response.status_code = next(responses)
+        response.headers['Retry-After'] = '120'
+        return response
+
+    monkeypatch.setattr(fetch_client.session, 'get', rate_limited_get)
+    assert fetch_client.get(URL).status_code == 200
+    assert sleeps == [120.0]
+
+
+def test_retry_after_above_the_maximum_gives_up(monkeypatch):
+    sleeps = []
+    limiter = CountingLimiter()
+    monkeypatch.setattr(fetch_client, 'limiter', limiter)
+    monkeypatch.setattr(fetch_client_module.time, 'sleep', sleeps.append)
+
+    def rate_limited_get(*args, **kwargs):
+        response = ok_response()
+        response.status_code = 429
+        response.headers['Retry-After'] = str(int(fetch_client_module.RETRY_AFTER_MAX) + 1)
+        return response
+
+    monkeypatch.setattr(fetch_client.session, 'get', rate_limited_get)
+    assert fetch_client.get(URL).status_code == 429
+    assert sleeps == [] and limiter.calls == [URL]
+
+
+def test_a_run_limiter_leaves_the_default_limiter_alone(tmp_path, monkeypatch):
+    default, run = CountingLimiter(), CountingLimiter()
+    monkeypatch.setattr(fetch_client, 'limiter', default)
+    monkeypatch.setattr(fetch_client.session, 'get', ok_response)
+
+    cache = PageCache(directory=str(tmp_path), max_age=0)
+    cache.fetch(URL, limiter=run)
+    cache.fetch(URL)
+    assert run.calls == [URL] and default.calls == [URL]
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+import db_session
+from app.glicko_engine import rate_period, replay_glicko, GLICKO_INITIAL_RD, GLICKO_INITIAL_VOLATILITY
+from app.logic import glicko_winner, GLICKO_SCALE
+from app.models import Boxer, RankingMetrics
+from app.ratings import BASE_RATING
+
+
+def test_rating_period_matches_the_glicko2_paper_example():
+    # Glickman's worked example: a 1500/200 player beats a 1400/30 player, then loses to 1550/100 and 1700/300
+    ratings = np.array([1500.0, 1400.0, 1550.0, 1700.0])
+    deviations = np.array([200.0, 30.0, 100.0, 300.0])
+    mu = (ratings - BASE_RATING) / GLICKO_SCALE
+    phi = deviations / GLICKO_SCALE
+    sigma = np.full(4, 0.06)
+    seen = np.ones(4, dtype=bool)
+
+    rate_period(mu, phi, sigma, seen, np.zeros(3, dtype=np.int64), np.array([1, 2, 3]), np.array([1.0, 0.0, 0.0]))
+
+    assert BASE_RATING + GLICKO_SCALE * mu[0] == pytest.approx(1464.06, abs=0.01)
+    assert GLICKO_SCALE * phi[0] == pytest.approx(151.52, abs=0.01)
+    assert sigma[0] == pytest.approx(0.05999, abs=0.00001)
+
+
+def glicko_columns(engine):
+    with engine.connect() as conn:
+        return {row[0]: row[1:] for row in conn.execute(
+            select(RankingMetrics.boxer_id, RankingMetrics.glicko_rating, RankingMetrics.glicko_rd))}
+
+
+def test_replay_rates_one_period_per_year(add_bouts, db_engine):
+    add_bouts([(2, 1, 2, 1936), (1, 2, 1, 1938), (1, 3, 1, 1941), (3, 1, 1, 1941)],
+              names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    with db_session.session_scope() as session:
+        summary = replay_glicko(session)
+    # 1936 to 1941, the years without bouts included
+    assert summary == {**summary, 'bouts': 4, 'periods': 6, 'boxers': 3}
+
+    ratings = glicko_columns(db_engine)
+    assert ratings[1][0] > BASE_RATING > ratings[3][0]
+    assert all(rd < GLICKO_INITIAL_RD for _, rd in ratings.values())
+    # Schmeling sat out 1941, so his deviation grew back while Louis's kept shrinking
+    assert ratings[2][1] > ratings[1][1]
+
+
+def test_deviation_grows_for_every_year_of_a_layoff(add_bouts, db_engine):
+    # Louis and Schmeling box in 1936 and then sit out four rating periods while two other boxers meet in 1940
+    add_bouts([(1, 2, 1, 1936), (3, 4, 3, 1940)], names=['Joe Louis', 'Max Schmeling', 'Tony Galento', 'Lou Nova'])
+    with db_session.session_scope() as session:
+        replay_glicko(session)
+
+    mu = np.zeros(2)
+    phi = np.full(2, GLICKO_INITIAL_RD / GLICKO_SCALE)
+    sigma = np.full(2, GLICKO_INITIAL_VOLATILITY)
+    rate_period(mu, phi, sigma, np.zeros(2, dtype=bool), np.array([0]), np.array([1]), np.array([1.0]))
+    after_layoff = GLICKO_SCALE * np.sqrt(phi[0] ** 2 + 4 * sigma[0] ** 2)
+
+    assert glicko_columns(db_engine)[1][1] == pytest.approx(after_layoff)
+
+
+def test_glicko_winner_falls_back_for_unrated_boxers(add_bouts, web_app):
+    add_bouts([(1, 2, 1, 1938)], names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    with db_session.session_scope() as session:
+        replay_glicko(session)
+
+    winner_id, probability, _, differential, _ = glicko_winner(Boxer(id=1), Boxer(id=3))
+    assert winner_id == 1 and probability > 0.5
+    assert differential.endswith("/ 50)")
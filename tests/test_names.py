@@ -0,0 +1,84 @@
+import itertools
+
+import pytest
+
+from app.names import normalize_name, key_suffix, trigrams, NameIndex, NAME_MATCH_THRESHOLD, NAME_MATCH_MARGIN
+
+
+@pytest.mark.parametrize('name, key', [
+    ('Joe Louis', 'joe louis'),
+    ('Joe L. Louis (boxer)', 'joe louis'),
+    ('Teófilo Stevenson', 'teofilo stevenson'),
+    ("Jack O'Dowd", 'jack odowd'),
+    ('Ken Norton Jr.', 'ken norton jr'),
+    ('Ken Norton, Junior', 'ken norton jr'),
+    ('Floyd J. Mayweather Sr.', 'floyd mayweather sr'),
+    ('George Foreman III', 'george foreman iii'),
+    ('Junior Jones', 'junior jones'),
+    ('', None),
+    (None, None),
+])
+def test_normalize_name(name, key):
+    assert normalize_name(name) == key
+
+
+ROSTER = NameIndex([
+    (1, 'Ken Norton'), (2, 'George Foreman'), (3, 'Larry Holmes'), (4, 'Ron Lyle'),
+    (5, 'Floyd Mayweather Sr.'), (6, 'Floyd Mayweather Jr.'), (7, 'Teófilo Stevenson'), (8, 'Lennox Lewis'),
+    (9, 'John Ruiz'), (10, 'John Ruiz'),
+])
+
+
+@pytest.mark.parametrize('name, boxer_id', [
+    ('Ken Norton', 1),
+    ('Teofilo Stevenson (boxer)', 7),
+    ('Lennox C. Lewis', 8),
+    ('Lenox Lewis', 8),
+    ('Floyd Maywether Jr', 6),
+    ('Floyd Mayweather, Senior', 5),
+])
+def test_resolve(name, boxer_id):
+    assert ROSTER.resolve(name) == boxer_id
+
+
+# a son is never resolved to his father, however close the rest of the name is
+@pytest.mark.parametrize('name', ['Ken Norton Jr.', 'George Foreman III', 'Larry Holmes Jr', 'Ron Lyle Jr.',
+                                  'Floyd Mayweather'])
+def test_generations_are_not_fuzzy_matched(name):
+    assert ROSTER.resolve(name) is None
+
+
+def test_ambiguous_and_unknown_names_stay_unresolved():
+    assert ROSTER.resolve('John Ruiz') == 9
+    assert ROSTER.resolve('John A. Ruiz') is None
+    assert ROSTER.resolve('Rocky Marciano') is None
+    assert ROSTER.resolve(None) is None
+
+
+# the lookup without prefix filtering: every key of the same generation is scored
+def resolve_by_scanning(index, name):
+    key = normalize_name(name)
+    if key not in index.keys:
+        grams = trigrams(key)
+        scores = sorted(((len(grams & index.key_trigrams[candidate]) /
+                          len(grams | index.key_trigrams[candidate]), candidate)
+                         for candidate in index.key_trigrams if key_suffix(candidate) == key_suffix(key)),
+                        reverse=True)
+        if not scores or scores[0][0] < NAME_MATCH_THRESHOLD or \
+                (len(scores) > 1 and scores[0][0] - scores[1][0] < NAME_MATCH_MARGIN):
+            return None
+        key = scores[0][1]
+    ids = index.keys[key]
+    return next(iter(ids)) if len(ids) == 1 else None
+
+
+def test_prefix_filtering_finds_what_a_full_scan_finds():
+    first = ['John', 'Joe', 'Johnny', 'Jon', 'Jack', 'James', 'Jimmy', 'Tommy', 'Tony', 'Tom']
+    last = ['Johnson', 'Jackson', 'Jameson', 'Thompson', 'Tomson', 'Johnston', 'Jones', 'Jonson']
+    index = NameIndex(enumerate((f"{a} {b}" for a, b in itertools.product(first, last)), 1))
+
+    # every name with one letter of the surname dropped, some close enough to resolve and some ambiguous
+    misspelt = [f"{a} {b[:i] + b[i + 1:]}" for a, b in itertools.product(first, last) for i in range(1, len(b))]
+    resolved = [index.resolve(name) for name in misspelt]
+    assert resolved == [resolve_by_scanning(index, name) for name in misspelt]
+    assert any(resolved) and not all(resolved)
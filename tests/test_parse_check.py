@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from conftest import ROOT
+from page_cache import find_saved_pages
+from parse_check import compare_parse_modes
+from scraper import make_document, extract_data
+
+# saved boxer pages: a long pro career, a disambiguated page with draws and a no contest,
+# an amateur with no pro record, and a list page without an infobox
+PAGES = os.path.join(ROOT, 'tests', 'fixtures', 'pages')
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('path', find_saved_pages(PAGES), ids=os.path.basename)
+def test_partial_parse_matches_full_parse(path):
+    html = read(path)
+    assert extract_data(make_document(html, 'partial')) == extract_data(make_document(html, 'full'))
+
+
+def test_compare_parse_modes_over_fixtures():
+    assert compare_parse_modes(PAGES)
+
+
+def test_fixtures_exercise_the_extraction():
+    louis, louis_fights = extract_data(make_document(read(os.path.join(PAGES, 'joe_louis.html')), 'partial'))
+    assert louis['name'] == 'Joe Louis'
+    assert (louis['height_cm'], louis['reach_cm'], louis['stance']) == (187, 193, 'Orthodox')
+    assert len(louis_fights) == louis['num_of_fights'] == 29
+    assert louis_fights[0]['Opponent'] == 'Rocky Marciano'
+
+    blin, blin_fights = extract_data(make_document(read(os.path.join(PAGES, 'jurgen_blin_boxer.html')), 'partial'))
+    assert blin['name'] == 'Jürgen Blin'
+    assert blin['stance'] == 'Southpaw'
+    assert {fight['Result'] for fight in blin_fights} == {'Win', 'Loss', 'Draw', 'NC'}
+
+    stevenson, stevenson_fights = extract_data(
+        make_document(read(os.path.join(PAGES, 'teofilo_stevenson.html')), 'partial'))
+    assert stevenson['name'] == 'Teófilo Stevenson'
+    assert stevenson_fights == []
+
+    assert extract_data(make_document(read(os.path.join(PAGES, 'list_of_heavyweight_champions.html')), 'partial')) \
+        == (None, None)
@@ -0,0 +1,47 @@
+import pytest
+
+import db_session
+from app.models import Boxer, RankingMetrics
+
+
+@pytest.fixture
+def client(web_app):
+    with db_session.session_scope() as session:
+        session.add_all([Boxer(id=1, name='Joe Louis', photo=''), Boxer(id=2, name='Max Schmeling', photo=''),
+                         RankingMetrics(boxer_id=1, elo_rating=1700.0),
+                         RankingMetrics(boxer_id=2, elo_rating=1550.0)])
+        session.commit()
+    return web_app.test_client()
+
+
+def test_batch_predicts_each_pair(client):
+    response = client.post('/api/predict/batch', json={'pairs': [[1, 2], [2, 1], [1, 99]]})
+    assert response.status_code == 200
+    louis, reverse, unknown = response.get_json()['predictions']
+
+    assert louis['winner_id'] == 1 and reverse['winner_id'] == 1
+    assert louis['win_probability'] == reverse['win_probability'] > 0.5
+    assert louis['rating_gap'] == -reverse['rating_gap'] > 0
+    assert unknown == {'boxer_a_id': 1, 'boxer_b_id': 99, 'error': 'Boxer not found'}
+
+
+def test_batch_streams_ndjson(client):
+    response = client.post('/api/predict/batch?format=ndjson', json={'pairs': [[1, 2], [2, 1]]})
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+
+
+@pytest.mark.parametrize('pairs', [
+    [],
+    [[1]],
+    [[1, '2']],
+    [[1, 2.0]],
+    [[True, 2]],
+    [[1, False]],
+    [[1, 2 ** 63]],
+    [[-2 ** 63 - 1, 2]],
+])
+def test_batch_rejects_bad_pairs(client, pairs):
+    response = client.post('/api/predict/batch', json={'pairs': pairs})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,20 @@
+from sqlalchemy import insert
+
+from app.models import Boxer, RankingMetrics
+from app.ratings import RatingsSnapshot, metric_rows
+
+
+def test_unknown_ids_get_the_default_without_a_reload(web_app, db_engine):
+    with db_engine.begin() as conn:
+        conn.execute(insert(Boxer), [{'id': 1, 'name': 'Joe Louis', 'photo': ''},
+                                     {'id': 2, 'name': 'Max Schmeling', 'photo': ''}])
+        conn.execute(insert(RankingMetrics), [{'boxer_id': 1, 'elo_rating': 1700.0}])
+
+    loads = []
+    rows = metric_rows(RankingMetrics.elo_rating)
+    snapshot = RatingsSnapshot(lambda session: loads.append(1) or rows(session), default=1500.0)
+
+    assert snapshot.rating(1) == 1700.0
+    # a boxer without a rating, and ids that are not in the snapshot at all
+    assert [snapshot.rating(boxer_id) for boxer_id in (2, 3, -1, 3)] == [1500.0] * 4
+    assert len(loads) == 1
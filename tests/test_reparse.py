@@ -0,0 +1,48 @@
+import copy
+import datetime
+import os
+
+from sqlalchemy import select
+
+from conftest import ROOT
+from scraper import parse_data, load_batch
+from app.models import Fight
+
+PAGE = os.path.join(ROOT, 'tests', 'fixtures', 'pages', 'jurgen_blin_boxer.html')
+
+
+# psycopg2 casts ISO date strings and the era list itself; SQLite needs them converted first
+def for_sqlite(data):
+    for key in ('birth_date', 'active_from', 'active_until'):
+        if data.get(key):
+            data[key] = datetime.date.fromisoformat(data[key])
+    data['era'] = ','.join(data['era'] or [])
+    return data
+
+
+def stored_fights(engine):
+    with engine.connect() as conn:
+        return {(row.date.isoformat(), row.opponent_name): row for row in conn.execute(select(Fight))}
+
+
+def test_reparse_updates_stored_fights(db_engine):
+    with open(PAGE, 'r', encoding='utf-8') as f:
+        data, fight_matrix = parse_data(f.read())
+    data = for_sqlite(data)
+    load_batch([(data, fight_matrix)])
+    before = stored_fights(db_engine)
+    assert len(before) == len(fight_matrix)
+
+    # the extraction rules changed: the debut is now read as a TKO at a corrected venue
+    revised = copy.deepcopy(fight_matrix)
+    revised[-1]['Type'] = 'TKO'
+    revised[-1]['Location'] = 'Sporthalle, Hamburg, West Germany'
+
+    load_batch([(data, revised)])
+    assert stored_fights(db_engine)[('1969-04-01', 'Horst Benedens')].method == 'KO'
+
+    load_batch([(data, revised)], update=True)
+    after = stored_fights(db_engine)
+    debut = after[('1969-04-01', 'Horst Benedens')]
+    assert (debut.method, debut.location) == ('TKO', 'Sporthalle, Hamburg, West Germany')
+    assert {key: row.id for key, row in after.items()} == {key: row.id for key, row in before.items()}
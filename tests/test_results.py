@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import insert
+
+from app.models import Boxer, RankingMetrics
+
+
+@pytest.fixture
+def client(web_app, db_engine):
+    with db_engine.begin() as conn:
+        conn.execute(insert(Boxer), [{'id': 1, 'name': 'Joe Louis', 'photo': ''},
+                                     {'id': 2, 'name': 'Max Schmeling', 'photo': ''}])
+        # Louis leads on Elo and TrueSkill, Schmeling on Glicko, so each engine names its own winner
+        conn.execute(insert(RankingMetrics), [
+            {'boxer_id': 1, 'elo_rating': 1700.0, 'glicko_rating': 1400.0, 'glicko_rd': 60.0,
+             'trueskill_mu': 1650.0, 'trueskill_sigma': 80.0},
+            {'boxer_id': 2, 'elo_rating': 1550.0, 'glicko_rating': 1600.0, 'glicko_rd': 60.0,
+             'trueskill_mu': 1500.0, 'trueskill_sigma': 80.0}])
+    return web_app.test_client()
+
+
+@pytest.mark.parametrize('engine, engine_name, winner', [
+    ('elo', 'Elo', 'Joe Louis'),
+    ('glicko', 'Glicko-2', 'Max Schmeling'),
+    ('trueskill', 'TrueSkill', 'Joe Louis'),
+    ('bradley-terry', 'Elo', 'Joe Louis'),
+    (None, 'Elo', 'Joe Louis'),
+])
+def test_results_dispatches_to_the_chosen_engine(client, engine, engine_name, winner):
+    form = {'boxer_a': 1, 'boxer_b': 2}
+    if engine:
+        form['engine'] = engine
+    page = client.post('/results', data=form).get_data(as_text=True)
+
+    assert f'id="rating-engine" class="retro-gradient-subtitle-elo bobbing">{engine_name}</p>' in page
+    assert f'{winner} Wins' in page
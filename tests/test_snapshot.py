@@ -0,0 +1,31 @@
+from sqlalchemy import create_engine, insert
+
+import config
+from app import create_app, db
+from app.models import Boxer
+from app.snapshot import export_snapshot
+
+
+def live_database(path, names):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Boxer.__table__.delete())
+        conn.execute(insert(Boxer), [{'id': i, 'name': name, 'photo': ''} for i, name in enumerate(names, 1)])
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+def test_replaced_snapshot_is_served_without_a_restart(tmp_path, monkeypatch):
+    snapshot = str(tmp_path / 'snapshot.db')
+    export_snapshot(snapshot, live_database(tmp_path / 'live.db', ['Joe Louis']))
+
+    monkeypatch.setattr(config, 'SNAPSHOT_PATH', snapshot)
+    app = create_app()
+    app.extensions['snapshot_watcher'].recheck_seconds = 0
+    client = app.test_client()
+    assert client.get('/api/boxer/1').get_json()['name'] == 'Joe Louis'
+
+    export_snapshot(snapshot, live_database(tmp_path / 'live.db', ['Max Schmeling', 'Joe Louis']))
+    assert client.get('/api/boxer/1').get_json()['name'] == 'Max Schmeling'
+    assert client.get('/api/boxer/2').get_json()['name'] == 'Joe Louis'
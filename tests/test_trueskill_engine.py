@@ -0,0 +1,56 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+import db_session
+from app.trueskill_engine import norm_cdf, replay_trueskill
+from app.logic import trueskill_winner, TRUESKILL_BETA, TRUESKILL_SIGMA
+from app.models import Boxer, RankingMetrics
+from app.ratings import BASE_RATING
+
+
+def test_norm_cdf_matches_the_standard_library():
+    x = np.linspace(-8, 8, 321)
+    assert norm_cdf(x) == pytest.approx([NormalDist().cdf(value) for value in x], abs=1.2e-7)
+
+
+def replay(engine):
+    with db_session.session_scope() as session:
+        summary = replay_trueskill(session)
+    with engine.connect() as conn:
+        return summary, {row[0]: row[1:] for row in conn.execute(
+            select(RankingMetrics.boxer_id, RankingMetrics.trueskill_mu, RankingMetrics.trueskill_sigma))}
+
+
+def test_single_bout_matches_the_closed_form_update(add_bouts, db_engine):
+    add_bouts([(1, 2, 1, 1938)], names=['Joe Louis', 'Max Schmeling'])
+    summary, skills = replay(db_engine)
+    assert summary['bouts'] == 1
+
+    # one win between two boxers at the prior: t = 0, so v = pdf(0) / cdf(0) and w = v^2
+    c = math.sqrt(2 * TRUESKILL_BETA ** 2 + 2 * TRUESKILL_SIGMA ** 2)
+    v = NormalDist().pdf(0) / 0.5
+    shift = TRUESKILL_SIGMA ** 2 / c * v
+    sigma = TRUESKILL_SIGMA * math.sqrt(1 - TRUESKILL_SIGMA ** 2 / c ** 2 * v ** 2)
+    assert skills[1] == pytest.approx((BASE_RATING + shift, sigma), rel=1e-6)
+    assert skills[2] == pytest.approx((BASE_RATING - shift, sigma), rel=1e-6)
+
+
+def test_replay_orders_a_chain_of_wins(add_bouts, db_engine):
+    add_bouts([(1, 2, 1, 1938), (2, 3, 2, 1939), (1, 3, 1, 1941)],
+              names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    _, skills = replay(db_engine)
+    assert skills[1][0] > skills[2][0] > skills[3][0]
+    assert all(sigma < TRUESKILL_SIGMA for _, sigma in skills.values())
+
+
+def test_trueskill_winner_treats_unrated_boxers_as_the_prior(add_bouts, web_app, db_engine):
+    add_bouts([(1, 2, 1, 1938)], names=['Joe Louis', 'Max Schmeling', 'Billy Conn'])
+    replay(db_engine)
+
+    winner_id, probability, _, differential, _ = trueskill_winner(Boxer(id=1), Boxer(id=3))
+    assert winner_id == 1 and probability > 0.5
+    assert differential.endswith(f"/ {TRUESKILL_SIGMA})")
@@ -0,0 +1,76 @@
+from sqlalchemy import func, select
+
+from db_session import session_scope
+from scraper import stage_boxer, stage_fights
+from app.models import Boxer, Fight, RankingMetrics
+
+
+def boxer(name, **fields):
+    return dict({'name': name, 'photo': '', 'wins': 1, 'losses': 0}, **fields)
+
+
+def bout(opponent, result, date, method='KO', location='Madison Square Garden'):
+    return {'No.': '1', 'Result': result, 'Opponent': opponent, 'Type': method, 'Round, time': '1 (10)',
+            'Date': date, 'Location': location, 'Notes': ''}
+
+
+LOUIS_RECORD = [
+    bout('Max Schmeling', 'Win', 'Jun 22, 1938'),
+    bout('Max Baer', 'Win', 'Sep 24, 1935'),
+    # an exhibition whose date the page does not give
+    bout('Jack Roper', 'Win', None, location='Los Angeles'),
+]
+
+
+def fight_count(engine):
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(Fight))
+
+
+def test_boxers_are_inserted_once_and_refreshed_on_update(db_engine):
+    with session_scope() as session:
+        louis_id = stage_boxer(session, boxer('Joe Louis', stance='Orthodox'))
+        assert louis_id
+        assert stage_boxer(session, boxer('Joe Louis', stance='Southpaw')) is None
+        assert session.scalar(select(Boxer.stance).filter_by(id=louis_id)) == 'Orthodox'
+
+        assert stage_boxer(session, boxer('Joe Louis', stance='Southpaw', wins=66), update=True) == louis_id
+        assert session.scalar(select(Boxer.stance).filter_by(id=louis_id)) == 'Southpaw'
+        assert session.scalar(select(RankingMetrics.wins).filter_by(boxer_id=louis_id)) == 66
+        assert session.scalar(select(func.count()).select_from(Boxer)) == 1
+
+
+def test_rerunning_a_page_adds_no_fights(db_engine):
+    for _ in range(3):
+        with session_scope() as session:
+            stage_boxer(session, boxer('Joe Louis'))
+            stage_fights(session, LOUIS_RECORD, boxer('Joe Louis'))
+    assert fight_count(db_engine) == len(LOUIS_RECORD)
+
+
+def test_fights_without_a_date_are_refreshed_on_update(db_engine):
+    with session_scope() as session:
+        stage_boxer(session, boxer('Joe Louis'))
+        stage_fights(session, LOUIS_RECORD, boxer('Joe Louis'))
+
+    revised = LOUIS_RECORD[:2] + [bout('Jack Roper', 'Win', None, method='TKO', location='Wrigley Field')]
+    with session_scope() as session:
+        stage_fights(session, revised, boxer('Joe Louis'), update=True)
+
+    with db_engine.connect() as conn:
+        exhibition = conn.execute(select(Fight).filter(Fight.date.is_(None))).one()
+    assert (exhibition.method, exhibition.location) == ('TKO', 'Wrigley Field')
+    assert fight_count(db_engine) == len(LOUIS_RECORD)
+
+
+def test_mirror_rows_from_the_opponents_page_are_skipped(db_engine):
+    with session_scope() as session:
+        stage_boxer(session, boxer('Joe Louis'))
+        stage_boxer(session, boxer('Max Schmeling'))
+        stage_fights(session, LOUIS_RECORD, boxer('Joe Louis'))
+        stage_fights(session, [bout('Joe Louis', 'Loss', 'Jun 22, 1938')], boxer('Max Schmeling'))
+
+    with db_engine.connect() as conn:
+        rows = conn.execute(select(Fight.boxer_a_id, Fight.bout_key).filter(Fight.bout_key.isnot(None))).all()
+    assert len(rows) == 1
+    assert fight_count(db_engine) == len(LOUIS_RECORD)